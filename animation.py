@@ -0,0 +1,142 @@
+import numpy as np
+
+from constants import RIGHT_FACING, LEFT_FACING
+
+
+class Animation:
+    """
+    Frames of one animation state, each shown for its own number of seconds.
+    mirrored_frames are used when the sprite faces left. With moving_only
+    the animation holds still unless the state function says the sprite
+    is moving.
+    """
+
+    def __init__(self, frames, durations, mirrored_frames=None, moving_only=False):
+        self.faces = {RIGHT_FACING: list(frames), LEFT_FACING: list(mirrored_frames or frames)}
+        self.durations = np.array(durations, dtype=float)
+        self.moving_only = moving_only
+
+        # Time each frame ends, for picking the frame with one search
+        self.ends = np.cumsum(self.durations)
+        self.total = float(self.ends[-1])
+
+
+class Animator:
+    """
+    Animates many sprites together from a table of Animations.
+
+    Each sprite has a state (an index in the table), a facing and the time
+    it has been in that state. The frame only depends on that time, so the
+    speed doesn't change with the frame rate. Textures are only set on the
+    sprites whose frame changed.
+
+    choose_states(sprites, faces) returns the new states, faces and moving
+    flags as arrays. Without it every sprite keeps the state it started with.
+    """
+
+    def __init__(self, sprites, animations, states=None, choose_states=None):
+        self.sprites = list(sprites)
+        self.animations = animations
+        self.choose_states = choose_states
+        count = len(self.sprites)
+
+        self.state = np.zeros(count, dtype=int) if states is None else np.array(states, dtype=int)
+        self.face = np.full(count, RIGHT_FACING, dtype=int)
+        self.elapsed = np.zeros(count)
+        self.moving_only = np.array([animation.moving_only for animation in animations], dtype=bool)
+
+        # Frame shown right now, -1 before the first update
+        self.frame = np.full(count, -1, dtype=int)
+
+    def index(self, sprite):
+        """ Row of a sprite in the arrays """
+        for i, other in enumerate(self.sprites):
+            if other is sprite:
+                return i
+        raise ValueError("Sprite isn't animated by this Animator")
+
+    def add(self, sprite, state=0):
+        """ Start animating one more sprite """
+        self.sprites.append(sprite)
+        self.state = np.append(self.state, state)
+        self.face = np.append(self.face, RIGHT_FACING)
+        self.elapsed = np.append(self.elapsed, 0.0)
+        self.frame = np.append(self.frame, -1)
+
+    def remove(self, sprite):
+        """ Stop animating a sprite """
+        i = self.index(sprite)
+        del self.sprites[i]
+        self.state = np.delete(self.state, i)
+        self.face = np.delete(self.face, i)
+        self.elapsed = np.delete(self.elapsed, i)
+        self.frame = np.delete(self.frame, i)
+
+    def restore(self, sprite, state, face, elapsed):
+        """ Put one sprite back in a saved state and show its frame right away, for snapshots """
+        i = self.index(sprite)
+        self.state[i] = state
+        self.face[i] = face
+        self.elapsed[i] = elapsed
+        self.frame[i] = self._frames()[i]
+        self.sprite_texture(i)
+
+    def _frames(self):
+        """ Frame of every sprite from its state and time """
+        frame = np.zeros(len(self.sprites), dtype=int)
+        for state, animation in enumerate(self.animations):
+            in_state = self.state == state
+            if in_state.any():
+                times = self.elapsed[in_state] % animation.total
+                frame[in_state] = np.minimum(np.searchsorted(animation.ends, times, side="right"),
+                                             len(animation.durations) - 1)
+        return frame
+
+    def sprite_texture(self, i):
+        animation = self.animations[self.state[i]]
+        self.sprites[i].texture = animation.faces[self.face[i]][self.frame[i]]
+
+    def update(self, delta_time):
+        if not self.sprites:
+            return
+
+        old_state = self.state
+        old_face = self.face
+        if self.choose_states is None:
+            moving = np.ones(len(self.sprites), dtype=bool)
+        else:
+            self.state, self.face, moving = self.choose_states(self.sprites, old_face)
+
+        # A new state starts at its first frame
+        new_state = self.state != old_state
+        self.elapsed[new_state] = 0.0
+        self.elapsed[moving | ~self.moving_only[self.state]] += delta_time
+
+        frame = self._frames()
+        changed = (frame != self.frame) | new_state | (self.face != old_face)
+        self.frame = frame
+        for i in np.flatnonzero(changed).tolist():
+            self.sprite_texture(i)
+
+
+def tile_animator(sprites):
+    """
+    Animator for the animated tiles of a tmx layer (arcade gives them a list
+    of frames), sprites with the same frames share one Animation.
+    """
+    animated = []
+    animations = []
+    states = []
+    table = {}
+    for sprite in sprites:
+        frames = getattr(sprite, "frames", None)
+        if not frames:
+            continue
+        key = tuple((id(frame.texture), frame.duration) for frame in frames)
+        if key not in table:
+            table[key] = len(animations)
+            animations.append(Animation([frame.texture for frame in frames],
+                                        [frame.duration / 1000 for frame in frames]))
+        animated.append(sprite)
+        states.append(table[key])
+    return Animator(animated, animations, states)
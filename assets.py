@@ -0,0 +1,94 @@
+import os
+import threading
+
+import arcade
+
+from atlas import Atlas
+
+
+class AssetRegistry:
+    """
+    Loads every texture and sound once for the whole game and hands out
+    the same object after that. Counts hits, misses and loaded bytes.
+    """
+
+    def __init__(self):
+        # (filename, mirrored) -> Texture
+        self.textures = {}
+        # (filename, streaming) -> Sound
+        self.sounds = {}
+
+        # filename -> name of the atlas it is packed in
+        self.atlas_names = {}
+        # atlas name -> its filenames, and the atlas once it is loaded
+        self.atlas_files = {}
+        self.atlases = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_loaded = 0
+
+        # The level loader thread can ask for textures too
+        self.lock = threading.Lock()
+
+    def use_atlas(self, name, filenames):
+        """ Load these images from one packed atlas, the first time one of them is asked for """
+        self.atlas_files[name] = list(filenames)
+        for filename in filenames:
+            self.atlas_names[filename] = name
+
+    def texture(self, filename, mirrored=False):
+        key = (filename, mirrored)
+        with self.lock:
+            texture = self.textures.get(key)
+            if texture is not None:
+                self.hits += 1
+                return texture
+
+            self.misses += 1
+            name = self.atlas_names.get(filename)
+            if name is None:
+                texture = arcade.load_texture(filename, mirrored=mirrored)
+            else:
+                atlas = self.atlases.get(name)
+                if atlas is None:
+                    atlas = self.atlases[name] = Atlas.load(name, self.atlas_files[name])
+                texture = atlas.texture(filename, mirrored)
+            self.textures[key] = texture
+            width, height = texture.image.size
+            self.bytes_loaded += width * height * 4
+            return texture
+
+    def texture_pair(self, filename):
+        """ The texture facing right and its mirror facing left """
+        return [self.texture(filename), self.texture(filename, mirrored=True)]
+
+    def sound(self, filename, streaming=False):
+        """ A streamed sound is decoded while it plays, for long music """
+        key = (filename, streaming)
+        with self.lock:
+            sound = self.sounds.get(key)
+            if sound is not None:
+                self.hits += 1
+                return sound
+
+            self.misses += 1
+            sound = arcade.load_sound(filename, streaming=streaming)
+            self.sounds[key] = sound
+            path = arcade.resources.resolve_resource_path(filename)
+            self.bytes_loaded += os.path.getsize(path)
+            return sound
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes": self.bytes_loaded,
+            "textures": len(self.textures),
+            "sounds": len(self.sounds),
+            "atlases": len(self.atlases),
+        }
+
+
+# One registry for the whole game
+assets = AssetRegistry()
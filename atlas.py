@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+
+import arcade
+import PIL.Image
+import PIL.ImageOps
+
+from constants import ATLAS_CACHE_DIR, ATLAS_WIDTH
+
+# Version of the cached files, change it when the layout changes
+ATLAS_VERSION = 1
+
+# Pixels left empty around every image
+PADDING = 1
+
+
+def source_hash(filenames):
+    """
+    Hash of the paths, sizes and change times of the source images, so a
+    changed image makes a new atlas. Only stats the files, reading them
+    would take most of the time the cache saves.
+    """
+    digest = hashlib.sha1(str(ATLAS_VERSION).encode())
+    for filename in filenames:
+        path = os.fspath(arcade.resources.resolve_resource_path(filename))
+        stat = os.stat(path)
+        digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+    return digest.hexdigest()[:16]
+
+
+def pack(sizes, width=ATLAS_WIDTH):
+    """
+    Place boxes of the given (width, height) in rows, tallest first.
+    Returns the (x, y) of each box and the size of the atlas.
+    """
+    width = max([width] + [w + 2 * PADDING for w, h in sizes])
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+    places = [None] * len(sizes)
+    x = y = row_height = used_width = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w + 2 * PADDING > width:
+            x = 0
+            y += row_height
+            row_height = 0
+        places[i] = (x + PADDING, y + PADDING)
+        x += w + 2 * PADDING
+        used_width = max(used_width, x)
+        row_height = max(row_height, h + 2 * PADDING)
+    return places, (used_width, y + row_height)
+
+
+class Atlas:
+    """
+    Many small images packed into one. The packed image is saved in
+    ATLAS_CACHE_DIR with the hash of its sources, so later starts read one
+    file instead of opening every image.
+    """
+
+    def __init__(self, image, rects):
+        self.image = image
+
+        # filename -> (x, y, width, height) in the image
+        self.rects = rects
+
+    def texture(self, filename, mirrored=False):
+        x, y, width, height = self.rects[filename]
+        image = self.image.crop((x, y, x + width, y + height))
+        if mirrored:
+            image = PIL.ImageOps.mirror(image)
+        return arcade.Texture(f"{filename}-atlas-{'mirrored' if mirrored else 'normal'}", image)
+
+    @classmethod
+    def build(cls, filenames, width=ATLAS_WIDTH):
+        images = [PIL.Image.open(arcade.resources.resolve_resource_path(filename)).convert("RGBA")
+                  for filename in filenames]
+        places, size = pack([image.size for image in images], width)
+
+        atlas_image = PIL.Image.new("RGBA", size)
+        rects = {}
+        for filename, image, (x, y) in zip(filenames, images, places):
+            atlas_image.paste(image, (x, y))
+            rects[filename] = (x, y, image.width, image.height)
+        return cls(atlas_image, rects)
+
+    @classmethod
+    def load(cls, name, filenames, cache_dir=ATLAS_CACHE_DIR):
+        """ The atlas of these images from the cache, built and saved there if it isn't cached yet """
+        path = os.path.join(cache_dir, f"{name}-{source_hash(filenames)}")
+        try:
+            with open(path + ".json") as file:
+                rects = {filename: tuple(rect) for filename, rect in json.load(file).items()}
+            return cls(PIL.Image.open(path + ".png").convert("RGBA"), rects)
+        except (OSError, ValueError):
+            pass
+
+        atlas = cls.build(filenames)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            atlas.image.save(path + ".png")
+            # The json goes last, a cache without it is never read
+            with open(path + ".json", "w") as file:
+                json.dump(atlas.rects, file)
+        except OSError:
+            # No cache this time, the atlas still works
+            pass
+        return atlas
@@ -0,0 +1,82 @@
+import logging
+
+import arcade
+
+from constants import MAX_VOICES_PER_SOUND
+
+logger = logging.getLogger(__name__)
+
+
+class AudioService:
+    """
+    Plays the sounds of a frame together, at most a few voices of each.
+
+    play() only marks a sound for this frame, so ten coins in one frame
+    are one trigger. flush() plays the frame's sounds, each one unless that
+    sound already has its maximum of voices playing. pyglet isn't thread
+    safe, so everything that touches it happens in flush(), on the thread
+    that runs the window.
+    """
+
+    def __init__(self, max_voices=MAX_VOICES_PER_SOUND):
+        self.max_voices = max_voices
+
+        # Sound -> voice limit, for sounds that don't use max_voices
+        self.limits = {}
+
+        # Sounds asked for this frame, in order
+        self.frame = {}
+
+        # ("play" | "stop", sound), done in the next flush()
+        self.commands = []
+
+        # Sound -> players still playing it
+        self.voices = {}
+
+    def set_limit(self, sound, voices):
+        self.limits[sound] = voices
+
+    def play(self, sound):
+        self.frame[sound] = True
+
+    def stop(self, sound):
+        """ Stop every voice of a sound, and don't start it this frame """
+        self.frame.pop(sound, None)
+        self.commands.append(("stop", sound))
+
+    def flush(self):
+        """ Call once per frame, from the window's thread """
+        commands = self.commands
+        commands.extend(("play", sound) for sound in self.frame)
+        self.commands = []
+        self.frame.clear()
+
+        for command, sound in commands:
+            try:
+                self._run(command, sound)
+            except Exception:
+                # A sound that fails shouldn't take the others with it
+                logger.exception("Can't %s sound %r", command, sound)
+
+    def _run(self, command, sound):
+        # Players that finished on their own still hold their source, a streamed one can't play again until then
+        players = []
+        for player in self.voices.get(sound, ()):
+            if player.playing:
+                players.append(player)
+            else:
+                player.delete()
+        self.voices[sound] = players
+
+        if command == "play":
+            if len(players) < self.limits.get(sound, self.max_voices):
+                players.append(arcade.play_sound(sound))
+        elif command == "stop":
+            for player in players:
+                player.pause()
+                player.delete()
+            self.voices[sound] = []
+
+
+# One audio service for the whole game
+audio = AudioService()
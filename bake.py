@@ -0,0 +1,264 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+
+import arcade
+import numpy as np
+import PIL.Image
+
+from constants import BAKED_DIR, LAST_LEVEL
+from enemies import EnemySpawn
+
+MAGIC = b"2DLV"
+VERSION = 2
+
+# magic, version, level, end of map, tmx size, tmx mtime,
+# number of textures, sprites, frames, spawns, hit box points,
+# offsets of the textures, sprites, frames, spawns, points, strings and pixels
+HEADER = struct.Struct("<4sBBdqq5I7Q")
+
+# Layers of LevelData, in the order of the layer field of a sprite
+LAYERS = ("platforms", "coins", "moving_platforms", "ladders", "dont_touch")
+
+TEXTURE = np.dtype([("width", "<u4"), ("height", "<u4"), ("pixels", "<u8"), ("name", "<u4"), ("name_size", "<u4"),
+                    ("points", "<u4"), ("point_count", "<u4")])
+SPRITE = np.dtype([("layer", "<u4"), ("texture", "<i4"), ("x", "<f8"), ("y", "<f8"), ("scale", "<f8"),
+                   ("change_x", "<f8"), ("change_y", "<f8"), ("boundary_left", "<f8"), ("boundary_right", "<f8"),
+                   ("boundary_bottom", "<f8"), ("boundary_top", "<f8"), ("frames", "<u4"), ("frame_count", "<u4")])
+FRAME = np.dtype([("texture", "<i4"), ("tile_id", "<i4"), ("duration", "<f8")])
+SPAWN = np.dtype([("kind", "<u4"), ("kind_size", "<u4"), ("left", "<f8"), ("bottom", "<f8"),
+                  ("boundary_left", "<f8"), ("boundary_right", "<f8"), ("change_x", "<f8"),
+                  ("chase", "u1")])
+
+BOUNDARIES = ("boundary_left", "boundary_right", "boundary_bottom", "boundary_top")
+
+
+def tmx_file(level):
+    return f":resources:tmx_maps/Admap_level_{level}.tmx"
+
+
+def baked_file(level):
+    return os.path.join(BAKED_DIR, f"Admap_level_{level}.lvl")
+
+
+def source_stamp(level):
+    """ Size and change time of a level's tmx file, a baked level is only used while they match """
+    stat = os.stat(arcade.resources.resolve_resource_path(tmx_file(level)))
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _none_to_nan(value):
+    return np.nan if value is None else float(value)
+
+
+def _nan_to_none(value):
+    return None if value != value else value
+
+
+def _align(parts, size):
+    """ Pad the parts so the next one starts at a multiple of 8, and return where it starts """
+    padding = -size % 8
+    if padding:
+        parts.append(bytes(padding))
+    return size + padding
+
+
+def to_bytes(level_data, stamp):
+    """ The layers and enemy spawns of a LevelData, with every texture's pixels """
+    textures = []
+    texture_index = {}
+    strings = bytearray()
+    pixels = bytearray()
+    points = []
+
+    def string(text):
+        offset = len(strings)
+        strings.extend(text.encode())
+        return offset, len(strings) - offset
+
+    def add_texture(texture, hit_box):
+        index = texture_index.get(id(texture))
+        if index is None:
+            index = texture_index[id(texture)] = len(textures)
+            image = texture.image.convert("RGBA")
+            name, name_size = string(texture.name)
+            textures.append((image.width, image.height, len(pixels), name, name_size, len(points), len(hit_box)))
+            pixels.extend(image.tobytes())
+            points.extend(hit_box)
+        return index
+
+    sprites = []
+    frames = []
+    for layer, layer_name in enumerate(LAYERS):
+        for sprite in getattr(level_data, layer_name):
+            texture = add_texture(sprite.texture, sprite.get_hit_box())
+            sprite_frames = getattr(sprite, "frames", None) or []
+            first_frame = len(frames)
+            for frame in sprite_frames:
+                frames.append((add_texture(frame.texture, sprite.get_hit_box()), frame.tile_id, frame.duration))
+            sprites.append((layer, texture, sprite.center_x, sprite.center_y, sprite.scale,
+                            sprite.change_x, sprite.change_y)
+                           + tuple(_none_to_nan(getattr(sprite, name)) for name in BOUNDARIES)
+                           + (first_frame, len(sprite_frames)))
+
+    spawns = []
+    for spawn in level_data.enemies:
+        kind, kind_size = string(spawn.kind)
+        spawns.append((kind, kind_size, spawn.left, spawn.bottom, _none_to_nan(spawn.boundary_left),
+                       _none_to_nan(spawn.boundary_right), spawn.change_x, spawn.chase))
+
+    sections = [np.array(textures, dtype=TEXTURE).tobytes(), np.array(sprites, dtype=SPRITE).tobytes(),
+                np.array(frames, dtype=FRAME).tobytes(), np.array(spawns, dtype=SPAWN).tobytes(),
+                np.array(points, dtype="<f8").reshape(-1, 2).tobytes(), bytes(strings), bytes(pixels)]
+    parts = []
+    offsets = []
+    size = _align(parts, HEADER.size)
+    for section in sections:
+        offsets.append(size)
+        parts.append(section)
+        size = _align(parts, size + len(section))
+
+    header = HEADER.pack(MAGIC, VERSION, level_data.level, level_data.end_of_map, *stamp,
+                         len(textures), len(sprites), len(frames), len(spawns), len(points), *offsets)
+    return header + b"".join(parts)
+
+
+def read(path, level, stamp=None):
+    """
+    The parts of a LevelData from a baked file, as a dict, or None if the
+    file is missing, broken, from another version or older than its tmx
+    file.
+    The file is memory mapped, texture pixels are used where they lie.
+    """
+    try:
+        with open(path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        result = _parse(data, level, stamp)
+    except (struct.error, ValueError):
+        # Cut short or broken, the tmx file is used instead
+        result = None
+    if result is None:
+        try:
+            data.close()
+        except BufferError:
+            # Something still looks at the pages, they go away with it
+            pass
+    return result
+
+
+def _parse(data, level, stamp):
+    """ read() of an open file, struct.error or ValueError if it is cut short or broken """
+    (magic, version, baked_level, end_of_map, size, mtime, texture_count, sprite_count, frame_count,
+     spawn_count, point_count, *offsets) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or baked_level != level:
+        return None
+    if stamp is not None and (size, mtime) != stamp:
+        return None
+
+    texture_rows = np.frombuffer(data, TEXTURE, texture_count, offsets[0])
+    sprite_rows = np.frombuffer(data, SPRITE, sprite_count, offsets[1])
+    frame_rows = np.frombuffer(data, FRAME, frame_count, offsets[2])
+    spawn_rows = np.frombuffer(data, SPAWN, spawn_count, offsets[3])
+    all_points = np.frombuffer(data, "<f8", point_count * 2, offsets[4]).reshape(-1, 2).tolist()
+    view = memoryview(data)
+    strings = bytes(view[offsets[5]:offsets[6]])
+    pixels = view[offsets[6]:]
+    _check(texture_rows, sprite_rows, frame_rows, spawn_rows, point_count, len(strings), len(pixels))
+
+    textures = []
+    hit_boxes = []
+    for width, height, start, name, name_size, first_point, count in texture_rows.tolist():
+        image = PIL.Image.frombuffer("RGBA", (width, height), pixels[start:start + width * height * 4],
+                                     "raw", "RGBA", 0, 1)
+        textures.append(arcade.Texture(strings[name:name + name_size].decode(), image, hit_box_algorithm="None"))
+        hit_boxes.append([tuple(point) for point in all_points[first_point:first_point + count]])
+
+    frames = [arcade.AnimationKeyframe(tile_id, duration, textures[texture])
+              for texture, tile_id, duration in frame_rows.tolist()]
+
+    layers = {name: arcade.SpriteList() for name in LAYERS}
+    for (layer, texture, x, y, scale, change_x, change_y, *boundaries,
+         first_frame, count) in sprite_rows.tolist():
+        if count:
+            sprite = arcade.AnimatedTimeBasedSprite(scale=scale)
+            sprite.frames = frames[first_frame:first_frame + count]
+        else:
+            sprite = arcade.Sprite(scale=scale)
+        sprite.texture = textures[texture]
+        sprite.set_hit_box(hit_boxes[texture])
+        sprite.center_x = x
+        sprite.center_y = y
+        sprite.change_x = change_x
+        sprite.change_y = change_y
+        for name, value in zip(BOUNDARIES, boundaries):
+            setattr(sprite, name, _nan_to_none(value))
+        layers[LAYERS[layer]].append(sprite)
+
+    enemies = [EnemySpawn(strings[kind:kind + kind_size].decode(), left, bottom, _nan_to_none(boundary_left),
+                          _nan_to_none(boundary_right), change_x, bool(chase))
+               for kind, kind_size, left, bottom, boundary_left, boundary_right, change_x, chase
+               in spawn_rows.tolist()]
+
+    return dict(layers, level=level, end_of_map=end_of_map, enemies=enemies)
+
+
+def _check(texture_rows, sprite_rows, frame_rows, spawn_rows, point_count, strings_size, pixels_size):
+    """ ValueError if an index in the rows points past what the file has """
+    texture_count = len(texture_rows)
+
+    def outside(first, count, size):
+        return bool(np.any(first.astype(np.int64) + count > size))
+
+    if (outside(texture_rows["pixels"], texture_rows["width"].astype(np.int64) * texture_rows["height"] * 4,
+                pixels_size)
+            or outside(texture_rows["name"], texture_rows["name_size"], strings_size)
+            or outside(texture_rows["points"], texture_rows["point_count"], point_count)
+            or outside(spawn_rows["kind"], spawn_rows["kind_size"], strings_size)
+            or outside(sprite_rows["frames"], sprite_rows["frame_count"], len(frame_rows))
+            or np.any(sprite_rows["layer"] >= len(LAYERS))
+            or np.any((sprite_rows["texture"] < 0) | (sprite_rows["texture"] >= texture_count))
+            or np.any((frame_rows["texture"] < 0) | (frame_rows["texture"] >= texture_count))):
+        raise ValueError("index past the end of the baked file")
+
+
+def bake(level):
+    """ Read a level's tmx file and write its baked file """
+    from levels import load_tmx_level
+
+    level_data = load_tmx_level(level)
+    os.makedirs(BAKED_DIR, exist_ok=True)
+    path = baked_file(level)
+    with open(path + ".tmp", "wb") as file:
+        file.write(to_bytes(level_data, source_stamp(level)))
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def main():
+    """ Bake every level, then time loading each one from tmx and from the baked file """
+    parser = argparse.ArgumentParser(description="Turn the tmx levels into files that load fast")
+    parser.add_argument("levels", type=int, nargs="*", default=list(range(1, LAST_LEVEL + 1)))
+    args = parser.parse_args()
+
+    from levels import load_tmx_level, load_level
+
+    for level in args.levels:
+        path = bake(level)
+        start = time.perf_counter()
+        load_tmx_level(level)
+        tmx_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        load_level(level)
+        baked_seconds = time.perf_counter() - start
+        print(f"{path}: {os.path.getsize(path) // 1024} KB, tmx {tmx_seconds * 1000:.1f} ms, "
+              f"baked {baked_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
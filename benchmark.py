@@ -0,0 +1,170 @@
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import headless  # noqa: F401, before arcade: the benchmark runs without a display
+import arcade
+
+from assets import assets
+from constants import TILE_SCALING, GRID_PIXEL_SIZE
+from enemies import EnemySpawn
+from levels import LevelCache, LevelData
+from profiler import profiler
+from simulation import GameSimulation, KEY_RIGHT, KEY_UP
+
+# Version of the JSON we write, change it when the fields change
+RESULT_VERSION = 3
+
+# About as wide as an Admap level, in tiles
+BASE_WIDTH = 100
+
+# Map widths (times BASE_WIDTH) and enemy counts we try
+WIDTH_SCALES = (1, 10, 100)
+ENEMY_COUNTS = (10, 100, 1000)
+
+TICKS = 600
+
+ENEMY_KINDS = ("wormGreen", "slimeGreen", "bee")
+
+
+def tile(filename, col, row):
+    sprite = arcade.Sprite(scale=TILE_SCALING)
+    sprite.texture = assets.texture(filename)
+    sprite.center_x = (col + 0.5) * GRID_PIXEL_SIZE
+    sprite.center_y = (row + 0.5) * GRID_PIXEL_SIZE
+    return sprite
+
+
+def make_level(width, enemy_count):
+    """
+    A level width tiles wide: ground all the way, two rows of coins, a
+    moving platform and a ladder every 10 tiles, spikes up high and
+    enemy_count enemies walking on the ground, every other one chasing
+    the player. The enemies stand right on the ground tiles, which only
+    turn them around at a wall in front of them, so they patrol.
+    """
+    platforms = arcade.SpriteList()
+    coins = arcade.SpriteList()
+    moving_platforms = arcade.SpriteList()
+    ladders = arcade.SpriteList()
+    dont_touch = arcade.SpriteList()
+
+    for col in range(width):
+        platforms.append(tile(":resources:images/tiles/grassMid.png", col, 0))
+        coins.append(tile(":resources:images/items/coinGold.png", col, 2))
+        coins.append(tile(":resources:images/items/coinGold.png", col, 5))
+
+        if col % 10 == 5:
+            platform_sprite = tile(":resources:images/tiles/grassMid.png", col, 7)
+            platform_sprite.boundary_left = (col - 3) * GRID_PIXEL_SIZE
+            platform_sprite.boundary_right = (col + 4) * GRID_PIXEL_SIZE
+            platform_sprite.change_x = 2
+            moving_platforms.append(platform_sprite)
+
+            ladders.append(tile(":resources:images/tiles/ladderMid.png", col, 1))
+            dont_touch.append(tile(":resources:images/tiles/spikes.png", col, 14))
+
+    # Enemies spread over the map, away from where the player starts
+    enemies = []
+    for i in range(enemy_count):
+        col = 10 + (i * (width - 12)) // max(enemy_count, 1)
+        left = col * GRID_PIXEL_SIZE
+        enemies.append(EnemySpawn(ENEMY_KINDS[i % len(ENEMY_KINDS)], left, GRID_PIXEL_SIZE,
+                                  left - 2 * GRID_PIXEL_SIZE, left + 3 * GRID_PIXEL_SIZE, 3, i % 2 == 0))
+
+    return LevelData(1, width * GRID_PIXEL_SIZE, platforms, coins, moving_platforms, ladders, dont_touch,
+                     enemies)
+
+
+def run_case(width, enemy_count, ticks, swept_physics):
+    """ Run one case and return its result row """
+    # Nobody reads the profiler's times here, don't spend the run taking them
+    profiler.enabled = False
+
+    start = time.perf_counter()
+    level_data = make_level(width, enemy_count)
+    build_seconds = time.perf_counter() - start
+
+    cache = LevelCache(loader=lambda level: level_data)
+    simulation = GameSimulation(cache=cache, swept_physics=swept_physics)
+
+    start = time.perf_counter()
+    simulation.setup(1)
+    setup_seconds = time.perf_counter() - start
+
+    start_x = simulation.enemy_store.x.copy()
+
+    # Run right and jump every half second
+    start = time.perf_counter()
+    for tick in range(ticks):
+        keys = KEY_RIGHT | KEY_UP if tick % 30 < 15 else KEY_RIGHT
+        simulation.step(keys)
+        simulation.events.clear()
+    run_seconds = time.perf_counter() - start
+
+    return {
+        "name": f"w{width}_e{enemy_count}",
+        "width_tiles": width,
+        "enemies": enemy_count,
+        "chasing_enemies": sum(spawn.chase for spawn in level_data.enemies),
+        # Enemies away from where they started, all of them unless some got stuck
+        "walking_enemies": int((simulation.enemy_store.x != start_x).sum()),
+        # Times the flow field to the player was searched, the same for any number of enemies
+        "path_searches": simulation.navigation.searches,
+        "coins": len(level_data.coins),
+        "moving_platforms": len(level_data.moving_platforms),
+        "ticks": ticks,
+        "build_seconds": round(build_seconds, 6),
+        "setup_seconds": round(setup_seconds, 6),
+        "ticks_per_second": round(ticks / run_seconds, 1),
+        # Kilobytes on Linux
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run_all(ticks=TICKS, width_scales=WIDTH_SCALES, enemy_counts=ENEMY_COUNTS, swept_physics=False):
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for scale in width_scales:
+        for enemy_count in enemy_counts:
+            # A fresh process for every case, so peak memory is only this case's
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                row = executor.submit(run_case, BASE_WIDTH * scale, enemy_count, ticks, swept_physics).result()
+            print(f"{row['name']:>12}: setup {row['setup_seconds'] * 1000:8.1f} ms, "
+                  f"{row['ticks_per_second']:8.0f} ticks/s, {row['peak_rss_kb'] // 1024} MB")
+            results.append(row)
+
+    return {
+        "version": RESULT_VERSION,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "physics": "swept" if swept_physics else "arcade",
+        "cases": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game loop on made up levels")
+    parser.add_argument("--output", default="bench.json", help="where to write the results")
+    parser.add_argument("--ticks", type=int, default=TICKS, help="ticks to run for each case")
+    parser.add_argument("--quick", action="store_true", help="only the smallest map and enemy count")
+    parser.add_argument("--swept", action="store_true", help="use the swept physics engine")
+    args = parser.parse_args()
+
+    if args.quick:
+        report = run_all(args.ticks, WIDTH_SCALES[:1], ENEMY_COUNTS[:1], args.swept)
+    else:
+        report = run_all(args.ticks, swept_physics=args.swept)
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import math
+
+import arcade
+
+from constants import (SCREEN_WIDTH, SCREEN_HEIGHT, LEFT_VIEWPORT_MARGIN, RIGHT_VIEWPORT_MARGIN,
+                       BOTTOM_VIEWPORT_MARGIN, TOP_VIEWPORT_MARGIN, CAMERA_SMOOTHING)
+
+
+class Camera:
+    """
+    Follows a sprite once per frame.
+
+    The sprite can move freely inside a deadzone (the screen minus the
+    margins). When it leaves it the camera moves toward where it should be,
+    smoothed over about `smoothing` seconds, and never shows past the left
+    or right end of the level. The position is kept in fractions of a pixel,
+    but the viewport is set in whole pixels and only when that changes.
+    """
+
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, smoothing=CAMERA_SMOOTHING,
+                 margins=(LEFT_VIEWPORT_MARGIN, RIGHT_VIEWPORT_MARGIN, BOTTOM_VIEWPORT_MARGIN, TOP_VIEWPORT_MARGIN)):
+        self.width = width
+        self.height = height
+        self.smoothing = smoothing
+        self.margin_left, self.margin_right, self.margin_bottom, self.margin_top = margins
+
+        # Bottom left corner of the view
+        self.left = 0.0
+        self.bottom = 0.0
+
+        # Jump straight to the target on the next update, no smoothing
+        self.snap = True
+
+        # (left, bottom) last given to set_viewport
+        self.shown = None
+
+    def reset(self):
+        """ Go back to the start of the level on the next update """
+        self.left = 0.0
+        self.bottom = 0.0
+        self.snap = True
+
+    def target(self, sprite):
+        """ Where the view has to be to have the sprite inside the deadzone """
+        left = self.left
+        if sprite.left < left + self.margin_left:
+            left = sprite.left - self.margin_left
+        elif sprite.right > left + self.width - self.margin_right:
+            left = sprite.right - self.width + self.margin_right
+
+        bottom = self.bottom
+        if sprite.top > bottom + self.height - self.margin_top:
+            bottom = sprite.top - self.height + self.margin_top
+        elif sprite.bottom < bottom + self.margin_bottom:
+            bottom = sprite.bottom - self.margin_bottom
+        return left, bottom
+
+    def update(self, sprite, delta_time, level_right=None):
+        left, bottom = self.target(sprite)
+
+        if self.snap or self.smoothing <= 0:
+            self.left, self.bottom = left, bottom
+            self.snap = False
+        else:
+            # The same share of the distance every second, whatever the frame rate
+            follow = 1 - math.exp(-delta_time / self.smoothing)
+            self.left += (left - self.left) * follow
+            self.bottom += (bottom - self.bottom) * follow
+
+        if level_right is not None:
+            self.left = min(self.left, level_right - self.width)
+        self.left = max(self.left, 0.0)
+
+        shown = (round(self.left), round(self.bottom))
+        if shown != self.shown:
+            self.shown = shown
+            arcade.set_viewport(shown[0], shown[0] + self.width, shown[1], shown[1] + self.height)
+
+    def visible_rect(self, margin=0):
+        """ (left, bottom, right, top) of what is on screen, grown by margin, for culling and chunks """
+        left, bottom = self.shown or (round(self.left), round(self.bottom))
+        return left - margin, bottom - margin, left + self.width + margin, bottom + self.height + margin
@@ -0,0 +1,90 @@
+import math
+
+from constants import CHUNK_WIDTH
+
+
+def chunk_index(x):
+    return math.floor(x / CHUNK_WIDTH)
+
+
+class ChunkedLayer:
+    """
+    Sprites of one layer split into columns CHUNK_WIDTH pixels wide.
+
+    Only the chunks in the shown range are in the sprite list, so drawing
+    it and checking collisions against it costs about one screen of sprites,
+    however long the map is. The sprite list is changed in place, so the
+    physics engine can keep a reference to it.
+    """
+
+    def __init__(self, sprite_list, sprites):
+        self.sprite_list = sprite_list
+
+        # chunk index -> sprites in that chunk
+        self.chunks = {}
+        for sprite in sprites:
+            self.chunks.setdefault(chunk_index(sprite.center_x), []).append(sprite)
+
+        # Chunks in the sprite list right now
+        self.first = 0
+        self.last = -1
+
+    def sprites(self):
+        """ All sprites of the layer, shown or not """
+        for chunk in self.chunks.values():
+            yield from chunk
+
+    def put_back(self, sprite):
+        """ Undo discard_all() for a sprite, it shows again if its chunk is shown """
+        index = chunk_index(sprite.center_x)
+        self.chunks.setdefault(index, []).append(sprite)
+        if self.first <= index <= self.last:
+            self.sprite_list.append(sprite)
+
+    def discard_all(self, sprites):
+        """ Forget sprites, so they don't come back when their chunk is shown again """
+        by_chunk = {}
+        for sprite in sprites:
+            by_chunk.setdefault(chunk_index(sprite.center_x), set()).add(id(sprite))
+        for index, ids in by_chunk.items():
+            chunk = self.chunks.get(index)
+            if chunk is not None:
+                chunk[:] = [sprite for sprite in chunk if id(sprite) not in ids]
+
+    def show(self, first, last):
+        """ Put chunks first..last in the sprite list and take the rest out """
+        if first == self.first and last == self.last:
+            return
+
+        for index in range(self.first, self.last + 1):
+            if not first <= index <= last:
+                for sprite in self.chunks.get(index, ()):
+                    self.sprite_list.remove(sprite)
+
+        new_sprites = []
+        for index in range(first, last + 1):
+            if not self.first <= index <= self.last:
+                new_sprites.extend(self.chunks.get(index, ()))
+        self.sprite_list.extend(new_sprites)
+
+        self.first = first
+        self.last = last
+
+
+class LevelChunks:
+    """ All chunked layers of a level, moved together """
+
+    def __init__(self):
+        self.layers = []
+
+    def add(self, sprite_list, sprites):
+        layer = ChunkedLayer(sprite_list, sprites)
+        self.layers.append(layer)
+        return layer
+
+    def update(self, left, right):
+        """ Show the chunks that touch the range left..right, with one more on each side """
+        first = chunk_index(left) - 1
+        last = chunk_index(right) + 1
+        for layer in self.layers:
+            layer.show(first, last)
@@ -0,0 +1,146 @@
+import argparse
+import asyncio
+import threading
+import time
+
+import arcade
+
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, NET_PORT, NET_INTERPOLATION_DELAY
+from animation import tile_animator
+from game_view import GameView
+from menu import GameOverView
+from net import GameClient
+
+
+def lerp(start, end, t):
+    return start + (end - start) * t
+
+
+class ClientView(GameView):
+    """
+    Draws a game that runs on a server. The level is loaded here too, but
+    never stepped: players, enemies, moving platforms and coins come from
+    the server's snapshots, drawn NET_INTERPOLATION_DELAY seconds in the
+    past so there are two snapshots to move between.
+    """
+
+    def __init__(self, host="127.0.0.1", port=NET_PORT):
+        super().__init__()
+
+        # The network runs on its own event loop, on its own thread
+        self.client = GameClient()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="network", daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(
+            self.loop.create_datagram_endpoint(lambda: self.client, remote_addr=(host, port)), self.loop)
+
+        # player id -> sprite
+        self.player_sprites = {}
+
+    def setup(self, level=1):
+        self.camera.reset()
+        self.simulation.level = level
+        self.simulation.setup(level)
+
+        # Players come from the snapshots
+        self.simulation.remove_player_sprite(self.simulation.player_sprite)
+        self.player_sprites = {}
+
+        self.update_hud_texts()
+        arcade.set_background_color(arcade.color.BLACK)
+
+    def on_key_press(self, key, modifiers):
+        self.keys |= self.key_bit(key)
+
+    def on_hide_view(self):
+        self.loop.call_soon_threadsafe(self.client.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def apply(self, state0, state1, t):
+        """ Put the world between two snapshots """
+        sim = self.simulation
+        if state1["level"] != sim.level:
+            self.setup(state1["level"])
+
+        if len(state1["coin_bits"]) == len(sim.coins.bits) and state1["coin_bits"] != bytes(sim.coins.bits):
+            sim.coins.set_bits(state1["coin_bits"])
+
+        for store, key in ((sim.enemy_store, "enemies"), (sim.platform_store, "platforms")):
+            start = state0[key].astype(float)
+            end = state1[key].astype(float)
+            if end.shape != (2, len(store)):
+                continue
+            if start.shape != end.shape:
+                start = end
+            store.x[:], store.y[:] = lerp(start, end, t)
+            store.push(everything=True)
+
+        # Players that left are taken out, new ones get a sprite
+        previous = {int(row["id"]): row for row in state0["players"]}
+        players = {int(row["id"]): row for row in state1["players"]}
+        for player_id in list(self.player_sprites):
+            if player_id not in players:
+                sim.remove_player_sprite(self.player_sprites.pop(player_id))
+        for player_id, row in players.items():
+            sprite = self.player_sprites.get(player_id)
+            if sprite is None:
+                sprite = self.player_sprites[player_id] = sim.add_player_sprite()
+            start = previous.get(player_id, row)
+            sprite.center_x = lerp(float(start["x"]), float(row["x"]), t)
+            sprite.center_y = lerp(float(start["y"]), float(row["y"]), t)
+            sprite.change_x = float(row["change_x"])
+            sprite.change_y = float(row["change_y"])
+
+        mine = players.get(self.client.player_id)
+        if mine is not None:
+            sim.player_sprite = self.player_sprites[self.client.player_id]
+            # The clock is drawn every frame, it only needs the time
+            sim.total_time = float(mine["time"])
+            if (sim.health, sim.game_score) != (int(mine["health"]), int(mine["score"])):
+                sim.health = int(mine["health"])
+                sim.game_score = int(mine["score"])
+                self.update_hud_texts()
+
+    def on_update(self, delta_time):
+        self.loop.call_soon_threadsafe(self.client.send_keys, self.keys)
+
+        state0, state1, t = self.client.around(time.monotonic() - NET_INTERPOLATION_DELAY)
+        if state1 is None:
+            return
+        self.apply(state0, state1, t)
+        if state1["finished"]:
+            self.window.show_view(GameOverView())
+            return
+
+        sim = self.simulation
+        sim.coins.compact()
+        sim.update_chunks()
+
+        if self.animated_coins is not sim.coins:
+            self.animated_coins = sim.coins
+            self.coin_animator = tile_animator(sim.coins.coins)
+        self.coin_animator.update(delta_time)
+        sim.background_list.update_animation(delta_time)
+        sim.player_animator.update(delta_time)
+
+        if self.client.player_id in self.player_sprites:
+            self.camera.update(self.player_sprites[self.client.player_id], delta_time, sim.end_of_map)
+            sim.view_rect = self.camera.visible_rect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play on a multiplayer server (start one with python net.py)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=NET_PORT)
+    args = parser.parse_args()
+
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT)
+    view = ClientView(args.host, args.port)
+    view.setup()
+    window.show_view(view)
+    arcade.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import arcade
+
+from constants import COIN_COMPACT_THRESHOLD
+from spatial import TileGrid
+
+
+class CoinStore:
+    """
+    All coins of a level, with one bit per coin saying if it is still there.
+
+    Collecting a coin only clears its bit, the grid and the chunks keep it.
+    Taking collected coins out of the sprite list is slow one by one, so
+    compact() does it for all of them together, once per frame or when
+    COIN_COMPACT_THRESHOLD coins are waiting.
+    """
+
+    def __init__(self, layer, threshold=COIN_COMPACT_THRESHOLD):
+        # The chunked layer that puts coins in the coin sprite list
+        self.layer = layer
+        self.threshold = threshold
+
+        self.coins = list(layer.sprites())
+        self.index = {id(coin): i for i, coin in enumerate(self.coins)}
+
+        # Bit i is set while coin i is there to collect
+        self.bits = bytearray(b"\xff" * ((len(self.coins) + 7) // 8))
+        self.active_count = len(self.coins)
+
+        # Coins never move, so they go in the grid once
+        self.grid = TileGrid()
+        self.grid.add_list(self.coins)
+
+        # Collected coins still in the layer
+        self.pending = []
+
+    def __len__(self):
+        return len(self.coins)
+
+    def is_active(self, i):
+        return bool(self.bits[i >> 3] & (1 << (i & 7)))
+
+    def collect_hits(self, sprite):
+        """ Collect the coins touching a sprite and return them """
+        # Check the bit first, the hit box check is the slow part
+        hits = [coin for coin in self.grid.nearby(sprite)
+                if self.is_active(self.index[id(coin)]) and arcade.check_for_collision(sprite, coin)]
+        for coin in hits:
+            i = self.index[id(coin)]
+            self.bits[i >> 3] &= ~(1 << (i & 7))
+            self.active_count -= 1
+            self.pending.append(coin)
+
+        if len(self.pending) >= self.threshold:
+            self.compact()
+        return hits
+
+    def compact(self):
+        """ Take every collected coin out of the chunks and the sprite list """
+        if not self.pending:
+            return
+        self.layer.discard_all(self.pending)
+        for coin in self.pending:
+            coin.remove_from_sprite_lists()
+        self.pending.clear()
+
+    def set_bits(self, bits):
+        """ Make the coins match a bitset from self.bits, for snapshots """
+        if len(bits) != len(self.bits):
+            raise ValueError("Coin bits are for another level")
+
+        # Only look at the coins in bytes that changed
+        for byte_index, (old, new) in enumerate(zip(self.bits, bits)):
+            if old == new:
+                continue
+            for bit in range(8):
+                i = byte_index * 8 + bit
+                if i >= len(self.coins):
+                    break
+                was_active = old & (1 << bit)
+                is_active = new & (1 << bit)
+                coin = self.coins[i]
+                if was_active and not is_active:
+                    self.pending.append(coin)
+                    self.active_count -= 1
+                elif is_active and not was_active:
+                    # A coin still waiting for compact() never left the chunks
+                    for j, other in enumerate(self.pending):
+                        if other is coin:
+                            del self.pending[j]
+                            break
+                    else:
+                        self.layer.put_back(coin)
+                    self.active_count += 1
+
+        self.bits[:] = bits
+        self.compact()
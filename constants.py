@@ -0,0 +1,90 @@
+import os
+
+# Constants
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+SCREEN_TITLE = "2D Platform Game"
+
+# Constants used to scale our sprites from their original size
+CHARACTER_SCALING = 0.5
+TILE_SCALING = 0.3
+COIN_SCALING = 0.3
+SPRITE_PIXEL_SIZE = 128
+GRID_PIXEL_SIZE = (SPRITE_PIXEL_SIZE * TILE_SCALING)
+SPRITE_SCALING = 0.3
+SPRITE_SIZE = int(SPRITE_PIXEL_SIZE * SPRITE_SCALING)
+
+# Speed of player
+PLAYER_MOVEMENT_SPEED = 4
+GRAVITY = 1
+PLAYER_JUMP_SPEED = 17
+
+# Seconds each walk and climb frame of the player is shown
+PLAYER_WALK_FRAME_TIME = 1 / 60
+PLAYER_CLIMB_FRAME_TIME = 4 / 60
+
+# Use physics.SweptPhysicsEngine instead of the arcade platformer engine
+SWEPT_PHYSICS = False
+
+# Pixel Scrolling
+
+LEFT_VIEWPORT_MARGIN = 250
+RIGHT_VIEWPORT_MARGIN = 250
+BOTTOM_VIEWPORT_MARGIN = 100
+TOP_VIEWPORT_MARGIN = 50
+
+# Seconds the camera takes to catch up about two thirds of the way, 0 to follow exactly
+CAMERA_SMOOTHING = 0.08
+
+
+PLAYER_START_X = SPRITE_PIXEL_SIZE * TILE_SCALING * 1.7
+PLAYER_START_Y = 400
+
+# Facing constants
+RIGHT_FACING = 0
+LEFT_FACING = 1
+
+# Simulation runs in fixed steps, no matter how fast we draw
+UPDATE_RATE = 1 / 60
+MAX_STEPS_PER_FRAME = 5
+
+# Most voices of one sound playing at the same time
+MAX_VOICES_PER_SOUND = 4
+
+# Seconds between updates of the timing overlay
+PROFILE_OVERLAY_INTERVAL = 0.5
+
+# Levels are split in columns this wide, only the ones near the player are drawn
+CHUNK_WIDTH = 400
+
+# Collected coins are taken out of the sprite list together, at most this many at a time
+COIN_COMPACT_THRESHOLD = 32
+
+# Folder of the game. Files the game writes go next to it, whatever the working directory.
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Packed texture atlases are kept here between starts
+ATLAS_CACHE_DIR = os.path.join(GAME_DIR, ".atlas_cache")
+ATLAS_WIDTH = 1024
+
+# Chasing enemies find their way to a player this many tiles away at most
+NAV_RANGE = 40
+
+# Levels made by bake.py
+BAKED_DIR = os.path.join(GAME_DIR, "baked")
+
+# Levels
+LAST_LEVEL = 3
+START_HEALTH = 3
+START_TIME = 301.0
+
+# Seconds the game holds still after the player died
+DEATH_PAUSE = 3
+
+# Multiplayer: server port, ticks between snapshots, snapshots kept as delta bases,
+# seconds before a silent client is dropped, and how far behind the server clients draw
+NET_PORT = 7777
+NET_SNAPSHOT_INTERVAL = 2
+NET_HISTORY = 64
+NET_TIMEOUT = 5.0
+NET_INTERPOLATION_DELAY = 0.1
@@ -0,0 +1,118 @@
+from collections import namedtuple
+
+import arcade
+
+from assets import assets
+from constants import SPRITE_SCALING, SPRITE_SIZE, TILE_SCALING
+
+# Object layer in the tmx file with one object per enemy
+ENEMIES_LAYER_NAME = 'Enemies'
+
+# Where an enemy starts, how far it walks and how fast, and whether it follows the player
+# instead of its boundaries. Positions are in screen pixels.
+EnemySpawn = namedtuple("EnemySpawn", ["kind", "left", "bottom", "boundary_left", "boundary_right", "change_x",
+                                       "chase"], defaults=[False])
+
+# Used for maps that don't have an Enemies layer
+DEFAULT_ENEMIES = [
+    EnemySpawn("wormGreen", SPRITE_SIZE * 2.5, SPRITE_SIZE * 3.2, SPRITE_SIZE * 2.5, SPRITE_SIZE * 16, 5),
+    EnemySpawn("slimeGreen", SPRITE_SIZE * 61.5, SPRITE_SIZE * 10.2, SPRITE_SIZE * 61.5, SPRITE_SIZE * 73, 8),
+    EnemySpawn("bee", SPRITE_SIZE * 24, SPRITE_SIZE * 3.7, SPRITE_SIZE * 24, SPRITE_SIZE * 39, 7),
+]
+
+# The default enemy images are packed in one atlas, other kinds are loaded on their own
+assets.use_atlas("enemies", [f":resources:images/enemies/{spawn.kind}.png" for spawn in DEFAULT_ENEMIES])
+
+
+def _scaled(value):
+    if value is None:
+        return None
+    return float(value) * TILE_SCALING
+
+
+def _flag(value):
+    """ A bool property, Tiled gives a bool but a hand written map can have the string "false" """
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def read_enemy_spawns(my_map):
+    """
+    Enemies from the Enemies object layer of a map.
+
+    Each object is the box the enemy starts in. Its type is the enemy
+    image name (wormGreen, slimeGreen, bee, ...) and it can have
+    boundary_left, boundary_right (in map pixels), change_x and chase
+    properties. An enemy with chase set to true walks toward the player
+    when it can find the way, the others walk between their boundaries.
+    """
+    layer = arcade.tilemap.get_tilemap_layer(my_map, ENEMIES_LAYER_NAME)
+    if layer is None:
+        return list(DEFAULT_ENEMIES)
+
+    # Tiled counts y down from the top of the map
+    map_height = my_map.map_size.height * my_map.tile_size.height
+
+    spawns = []
+    for tiled_object in layer.tiled_objects:
+        properties = tiled_object.properties or {}
+        left = tiled_object.location.x
+        bottom = map_height - tiled_object.location.y
+        if tiled_object.size is not None:
+            # Rectangles are placed by their top left corner
+            bottom -= tiled_object.size.height
+        spawns.append(EnemySpawn(
+            kind=tiled_object.type or tiled_object.name,
+            left=left * TILE_SCALING,
+            bottom=bottom * TILE_SCALING,
+            boundary_left=_scaled(properties.get("boundary_left")),
+            boundary_right=_scaled(properties.get("boundary_right")),
+            change_x=float(properties.get("change_x", 5)),
+            chase=_flag(properties.get("chase", False)),
+        ))
+    return spawns
+
+
+class EnemyPool:
+    """
+    Keeps enemy sprites of old levels around, so building a level takes
+    sprites from here instead of making new ones.
+    """
+
+    def __init__(self):
+        # kind -> sprites that are not used right now
+        self.free = {}
+
+    def spawn(self, spawn):
+        sprites = self.free.get(spawn.kind)
+        if sprites:
+            enemy = sprites.pop()
+        else:
+            enemy = arcade.Sprite(scale=SPRITE_SCALING)
+            enemy.texture = assets.texture(f":resources:images/enemies/{spawn.kind}.png")
+            enemy.kind = spawn.kind
+
+        enemy.change_y = 0
+        enemy.left = spawn.left
+        enemy.bottom = spawn.bottom
+        enemy.boundary_left = spawn.boundary_left
+        enemy.boundary_right = spawn.boundary_right
+        enemy.change_x = spawn.change_x
+        enemy.chase = spawn.chase
+        return enemy
+
+    def build(self, spawns):
+        """ A new sprite list with an enemy for every spawn """
+        enemy_list = arcade.SpriteList()
+        enemy_list.extend([self.spawn(spawn) for spawn in spawns])
+        return enemy_list
+
+    def release(self, enemy_list):
+        """ Give back all enemies of a sprite list that won't be used any more """
+        for enemy in enemy_list:
+            # The old list is thrown away, no need to take the sprite out of it one by one
+            enemy.sprite_lists = []
+            self.free.setdefault(enemy.kind, []).append(enemy)
+
+
+# One pool for the whole game
+enemy_pool = EnemyPool()
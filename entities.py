@@ -0,0 +1,192 @@
+import math
+
+import numpy as np
+
+
+def _boundary(value, zero_is_off):
+    """ Boundary as a float, NaN when there is none. Comparing with NaN is always False. """
+    if value is None or (zero_is_off and not value):
+        return math.nan
+    return float(value)
+
+
+class EntityStore:
+    """
+    Positions, speeds and boundaries of moving sprites in NumPy arrays, so
+    moving them and turning them around is a few array operations instead
+    of a Python loop with hit box work for every sprite.
+
+    Call pull() if something else moved the sprites, then move / bounce /
+    patrol, then push() to write the results back to the sprites.
+    """
+
+    def __init__(self, sprites, zero_is_off=False):
+        self.sprites = list(sprites)
+        count = len(self.sprites)
+
+        self.x = np.zeros(count)
+        self.y = np.zeros(count)
+        self.change_x = np.zeros(count)
+        self.change_y = np.zeros(count)
+        self.pull()
+
+        # Distance from the center to each side. The hit box doesn't change while moving.
+        self.to_left = self.x - np.array([sprite.left for sprite in self.sprites], dtype=float)
+        self.to_right = np.array([sprite.right for sprite in self.sprites], dtype=float) - self.x
+        self.to_bottom = self.y - np.array([sprite.bottom for sprite in self.sprites], dtype=float)
+        self.to_top = np.array([sprite.top for sprite in self.sprites], dtype=float) - self.y
+
+        # Moving walls check their boundaries with "if wall.boundary_left", so 0 means no boundary
+        self.boundary_left = np.array([_boundary(sprite.boundary_left, zero_is_off)
+                                       for sprite in self.sprites], dtype=float)
+        self.boundary_right = np.array([_boundary(sprite.boundary_right, zero_is_off)
+                                        for sprite in self.sprites], dtype=float)
+        self.boundary_bottom = np.array([_boundary(sprite.boundary_bottom, zero_is_off)
+                                         for sprite in self.sprites], dtype=float)
+        self.boundary_top = np.array([_boundary(sprite.boundary_top, zero_is_off)
+                                      for sprite in self.sprites], dtype=float)
+
+    def __len__(self):
+        return len(self.sprites)
+
+    @property
+    def left(self):
+        return self.x - self.to_left
+
+    @property
+    def right(self):
+        return self.x + self.to_right
+
+    @property
+    def bottom(self):
+        return self.y - self.to_bottom
+
+    @property
+    def top(self):
+        return self.y + self.to_top
+
+    def pull(self):
+        """ Read positions and speeds from the sprites """
+        self.x[:] = [sprite.center_x for sprite in self.sprites]
+        self.y[:] = [sprite.center_y for sprite in self.sprites]
+        self.change_x[:] = [sprite.change_x for sprite in self.sprites]
+        self.change_y[:] = [sprite.change_y for sprite in self.sprites]
+
+    def push(self, everything=False):
+        """ Write positions and speeds back to the sprites that move, or to all of them """
+        if everything:
+            moving = np.arange(len(self.sprites))
+        else:
+            moving = np.flatnonzero((self.change_x != 0) | (self.change_y != 0))
+        xs = self.x[moving].tolist()
+        ys = self.y[moving].tolist()
+        change_xs = self.change_x[moving].tolist()
+        change_ys = self.change_y[moving].tolist()
+        for i, index in enumerate(moving.tolist()):
+            sprite = self.sprites[index]
+            sprite.position = (xs[i], ys[i])
+            sprite.change_x = change_xs[i]
+            sprite.change_y = change_ys[i]
+
+    def to_bytes(self):
+        """ Positions and speeds, for snapshots """
+        return np.concatenate((self.x, self.y, self.change_x, self.change_y)).tobytes()
+
+    def load_bytes(self, data):
+        """ Set positions and speeds from to_bytes() and write them to every sprite """
+        values = np.frombuffer(data, dtype=float).reshape(4, len(self.sprites))
+        self.x[:], self.y[:], self.change_x[:], self.change_y[:] = values
+        self.push(everything=True)
+
+    def move(self):
+        """ Same as calling update() on every sprite """
+        self.x += self.change_x
+        self.y += self.change_y
+
+    def bounce(self):
+        """ Turn moving platforms around when they go past a boundary """
+        self.change_x[(self.right > self.boundary_right) & (self.change_x > 0)] *= -1
+        self.change_x[(self.left < self.boundary_left) & (self.change_x < 0)] *= -1
+        self.change_y[(self.top > self.boundary_top) & (self.change_y > 0)] *= -1
+        self.change_y[(self.bottom < self.boundary_bottom) & (self.change_y < 0)] *= -1
+
+    def patrol(self, hit_wall):
+        """ Turn enemies around when they hit a wall or walk out past their left / right boundary """
+        turn = (hit_wall | ((self.left < self.boundary_left) & (self.change_x < 0))
+                | ((self.right > self.boundary_right) & (self.change_x > 0)))
+        self.change_x[turn] *= -1
+
+    def ahead(self, margin=0.0):
+        """
+        Boxes each sprite moves through in its next step left or right, as
+        (left, bottom, right, top) arrays. margin is taken off the bottom and
+        the top, so what a sprite stands on isn't in front of it.
+        """
+        left = np.where(self.change_x > 0, self.right, self.left + self.change_x)
+        right = np.where(self.change_x > 0, self.right + self.change_x, self.left)
+        return left, self.bottom + margin, right, self.top - margin
+
+    def hits(self, left, bottom, right, top):
+        """ For each box given as arrays, whether it overlaps the box of any of our sprites """
+        if len(left) == 0 or len(self) == 0:
+            return np.zeros(len(left), dtype=bool)
+        hit = ((left[:, None] <= self.right[None, :]) & (right[:, None] >= self.left[None, :])
+               & (bottom[:, None] <= self.top[None, :]) & (top[:, None] >= self.bottom[None, :]))
+        return hit.any(axis=1)
+
+    def overlaps(self, other):
+        """ For each of our sprites, whether its box overlaps any box in another store """
+        return other.hits(self.left, self.bottom, self.right, self.top)
+
+
+class CellMap:
+    """
+    Which grid cells have a static sprite in them, as a NumPy array, so
+    we can check many boxes against the grid at once.
+
+    The grid also puts a sprite in the cells its sides are on the edge of,
+    so a floor tile would fill the cell above it. Here a cell is only
+    filled by a sprite that goes into it.
+    """
+
+    def __init__(self, grid):
+        size = self.cell_size = grid.cell_size
+        keys = [(col, row) for (col, row), bucket in grid.cells.items()
+                if any(id(sprite) not in grid.moving
+                       and sprite.left < (col + 1) * size and sprite.right > col * size
+                       and sprite.bottom < (row + 1) * size and sprite.top > row * size
+                       for sprite in bucket)]
+        if not keys:
+            keys = [(0, 0)]
+            empty = True
+        else:
+            empty = False
+        cols = [col for col, row in keys]
+        rows = [row for col, row in keys]
+        self.col0 = min(cols)
+        self.row0 = min(rows)
+        self.filled = np.zeros((max(cols) - self.col0 + 1, max(rows) - self.row0 + 1), dtype=bool)
+        if not empty:
+            self.filled[np.array(cols) - self.col0, np.array(rows) - self.row0] = True
+
+    def touches(self, left, bottom, right, top):
+        """ For each box given as arrays, whether any cell it is in is filled """
+        size = self.cell_size
+        col_min = np.floor(left / size).astype(int) - self.col0
+        col_max = np.floor(right / size).astype(int) - self.col0
+        row_min = np.floor(bottom / size).astype(int) - self.row0
+        row_max = np.floor(top / size).astype(int) - self.row0
+        result = np.zeros(len(left), dtype=bool)
+        if len(left) == 0:
+            return result
+
+        width, height = self.filled.shape
+        span_x = int((col_max - col_min).max()) + 1
+        span_y = int((row_max - row_min).max()) + 1
+        for dx in range(span_x):
+            cols = np.minimum(col_min + dx, col_max)
+            for dy in range(span_y):
+                rows = np.minimum(row_min + dy, row_max)
+                inside = (cols >= 0) & (cols < width) & (rows >= 0) & (rows < height)
+                result[inside] |= self.filled[cols[inside], rows[inside]]
+        return result
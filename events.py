@@ -0,0 +1,80 @@
+class Event:
+    """ Something that happened in the simulation """
+
+
+class PlayerJumped(Event):
+    pass
+
+
+class CoinCollected(Event):
+    def __init__(self, score):
+        # Score after this coin
+        self.score = score
+
+
+class PlayerHit(Event):
+    """ Player went back to the start and lost one health """
+
+    def __init__(self, cause, health):
+        # "enemy", "fall" or "dont_touch"
+        self.cause = cause
+        self.health = health
+
+
+class PlayerDied(Event):
+    """ Health ran out. Health, time and score have been reset already. """
+
+    def __init__(self, score):
+        self.score = score
+
+
+class LevelCompleted(Event):
+    def __init__(self, level):
+        # The level we go to now
+        self.level = level
+
+
+class GameFinished(Event):
+    pass
+
+
+class EventBus:
+    """
+    The simulation emits events into a queue during a tick. Whoever cares
+    subscribes to the event types and gets them when dispatch() is called,
+    once per frame. With nobody subscribed, dispatch() just empties the queue.
+    """
+
+    def __init__(self):
+        self.queue = []
+
+        # event type -> callbacks
+        self.subscribers = {}
+
+    def emit(self, event):
+        self.queue.append(event)
+
+    def subscribe(self, event_types, callback):
+        """ Call callback(event) for events of a type, or of any type in a tuple """
+        if not isinstance(event_types, tuple):
+            event_types = (event_types,)
+        for event_type in event_types:
+            self.subscribers.setdefault(event_type, []).append(callback)
+
+    def dispatch(self):
+        """ Give the queued events to their subscribers, in the order they happened """
+        events = self.queue
+        self.queue = []
+        for event in events:
+            for callback in self.subscribers.get(type(event), ()):
+                callback(event)
+        return events
+
+    def clear(self):
+        self.queue.clear()
+
+    def __iter__(self):
+        return iter(self.queue)
+
+    def __len__(self):
+        return len(self.queue)
@@ -0,0 +1,334 @@
+import os
+
+import arcade
+
+from animation import tile_animator
+from assets import assets
+from audio import audio
+from camera import Camera
+from constants import UPDATE_RATE, MAX_STEPS_PER_FRAME, PROFILE_OVERLAY_INTERVAL, DEATH_PAUSE
+from enemies import DEFAULT_ENEMIES
+from events import PlayerJumped, CoinCollected, PlayerHit, PlayerDied, LevelCompleted, GameFinished
+from hud import Hud
+from levels import level_cache
+from menu import GameOverView
+from player import player_animations
+from profiler import profiler, startup
+from replay import Recorder, REPLAY_FILE
+from simulation import GameSimulation, KEY_LEFT, KEY_RIGHT, KEY_UP, KEY_DOWN
+import snapshot
+
+COIN_SOUND = ":resources:sounds/coin1.wav"
+JUMP_SOUND = ":resources:sounds/jump1.wav"
+GAME_SOUND = ":resources:sounds/Child's Nightmare.ogg"
+GAME_OVER_SOUND = ":resources:sounds/gameover1.wav"
+LEVEL_UP_SOUND = ":resources:sounds/upgrade5.wav"
+
+
+def warm_up():
+    """ Load what the first level needs, so SPACE starts the game right away. Runs while the menu is up. """
+    level_cache.preload(1)
+    player_animations()
+    for spawn in DEFAULT_ENEMIES:
+        assets.texture(f":resources:images/enemies/{spawn.kind}.png")
+    for filename in (COIN_SOUND, JUMP_SOUND, GAME_OVER_SOUND, LEVEL_UP_SOUND):
+        assets.sound(filename)
+    assets.sound(GAME_SOUND, streaming=True)
+    level_cache.get(1)
+
+
+class GameView(arcade.View):
+    """
+    Main application class.
+
+    Game rules live in GameSimulation, this class only feeds it keys,
+    plays sounds and draws.
+    """
+
+    def __init__(self):
+
+        # Call the parent class and set up the window
+        super().__init__()
+
+        # Setting the path to start with this program
+        file_path = os.path.dirname(os.path.abspath(__file__))
+        os.chdir(file_path)
+
+        # Game state
+        self.simulation = GameSimulation()
+        self.recorder = None
+
+        # Keys held down right now, as KEY_* bits
+        self.keys = 0
+
+        # Last quick save, F5 makes one and F6 goes back to it
+        self.quick_save = None
+
+        # Animates the coins of the level, made again when the level changes
+        self.coin_animator = None
+        self.animated_coins = None
+
+        # Time not yet used by a simulation step
+        self.time_left_over = 0.0
+
+        # Follows the player, the HUD is drawn in screen space over it
+        self.camera = Camera()
+
+        self.background = None
+
+        # Time, score and health, in screen space
+        self.hud = Hud()
+        self.time_text = self.hud.add(350, 570, arcade.csscolor.WHITE, 18)
+        self.score_text = self.hud.add(10, 10, arcade.csscolor.WHITE, 18)
+        self.health_text = self.hud.add(10, 570, arcade.csscolor.WHITE, 18)
+
+        # Timing overlay, F3 shows it
+        self.show_profile = False
+        self.profile_hud = Hud()
+        self.profile_texts = []
+        self.profile_timer = 0.0
+
+        # Seconds left of the pause after dying
+        self.death_timer = 0.0
+
+        # Sound, HUD and camera react to what happens in the simulation
+        events = self.simulation.events
+        events.subscribe((PlayerJumped, CoinCollected, PlayerHit, LevelCompleted), self.queue_sound)
+        events.subscribe(PlayerDied, self.start_death_pause)
+        events.subscribe((CoinCollected, PlayerHit, PlayerDied), self.update_hud_texts)
+        events.subscribe((PlayerHit, PlayerDied, LevelCompleted), self.reset_camera)
+        events.subscribe(GameFinished, self.finish_game)
+
+        # Load sounds
+        self.collect_coin_sound = assets.sound(COIN_SOUND)
+        self.jump_sound = assets.sound(JUMP_SOUND)
+        self.game_sound = assets.sound(GAME_SOUND, streaming=True)
+        self.game_over = assets.sound(GAME_OVER_SOUND)
+        self.level_update_sound = assets.sound(LEVEL_UP_SOUND)
+
+        # A streamed sound can only play once at a time
+        audio.set_limit(self.game_sound, 1)
+
+    def setup(self, level=1):
+        """ Set up the game here. Call this function to restart the game. """
+
+        # arcade.play_sound(self.game_sound)
+
+        self.camera.reset()
+
+        self.simulation.setup(level)
+
+        # Everything from here on can be replayed
+        self.recorder = Recorder(self.simulation, level)
+
+        self.update_hud_texts()
+
+        # self.background = arcade.load_texture(":resources:images/backgrounds/back1.jpg")
+
+        # For other stuffs
+        arcade.set_background_color(arcade.color.BLACK)
+
+    def on_draw(self):
+        """ Render the screen. """
+        sim = self.simulation
+
+        # Clear the screen to the background color
+        arcade.start_render()
+
+        # scale = SCREEN_WIDTH / self.background.width
+        # arcade.draw_lrwh_rectangle_textured(-500, -300, 12800, 2560, self.background)
+        # Draw our sprites
+        with profiler.scope("draw walls"):
+            sim.wall_list.draw()
+        with profiler.scope("draw background"):
+            sim.background_list.draw()
+        with profiler.scope("draw ladders"):
+            sim.ladder_list.draw()
+        with profiler.scope("draw coins"):
+            sim.coin_list.draw()
+        with profiler.scope("draw player"):
+            sim.player_list.draw()
+        with profiler.scope("draw don't touch"):
+            sim.dont_touch_list.draw()
+        with profiler.scope("draw enemies"):
+            sim.enemy_list.draw()
+
+        # Calculating time
+        minutes = int(sim.total_time) // 60
+        seconds = int(sim.total_time) % 60
+        score_time = f"    {minutes:02d}:{seconds:02d}"
+
+        # for Showing time
+        self.time_text.set(score_time)
+
+        # Score and health are set by update_hud_texts when they change
+
+        # Texts are only laid out again when they changed
+        with profiler.scope("draw hud"):
+            self.hud.draw()
+
+        if self.show_profile:
+            self.profile_hud.draw()
+
+        startup.first_frame("SPACE to first game frame")
+
+        # Draw hit boxes. (after create map)
+        # for wall in sim.wall_list:
+        #     wall.draw_hit_box(arcade.color.BLACK, 3)
+        #
+        # sim.player_sprite.draw_hit_box(arcade.color.RED, 3)
+
+    def key_bit(self, key):
+        """ KEY_* bit of a keyboard key, 0 if the game doesn't use it """
+        if key == arcade.key.UP or key == arcade.key.W:
+            return KEY_UP
+        elif key == arcade.key.DOWN or key == arcade.key.S:
+            return KEY_DOWN
+        elif key == arcade.key.LEFT or key == arcade.key.A:
+            return KEY_LEFT
+        elif key == arcade.key.RIGHT or key == arcade.key.D:
+            return KEY_RIGHT
+        return 0
+
+    def on_key_press(self, key, modifiers):  # Keyboard functions
+        # Keys are given to the simulation on the next tick
+        self.keys |= self.key_bit(key)
+
+        if key == arcade.key.F9:
+            self.save_replay()
+        elif key == arcade.key.F5:
+            self.save_snapshot()
+        elif key == arcade.key.F6:
+            self.load_snapshot()
+        elif key == arcade.key.F3:
+            self.show_profile = not self.show_profile
+
+    def on_key_release(self, key, modifiers):
+        self.keys &= ~self.key_bit(key)
+
+    def save_replay(self):
+        self.recorder.save(REPLAY_FILE)
+
+    def save_snapshot(self):
+        self.quick_save = snapshot.to_bytes(self.simulation)
+        with open(snapshot.QUICK_SAVE_FILE, "wb") as file:
+            file.write(self.quick_save)
+
+    def load_snapshot(self):
+        """ Go back to the last quick save, or the one on disk from an earlier game """
+        if self.quick_save is None:
+            if not os.path.exists(snapshot.QUICK_SAVE_FILE):
+                return
+            with open(snapshot.QUICK_SAVE_FILE, "rb") as file:
+                self.quick_save = file.read()
+        try:
+            snapshot.restore(self.simulation, self.quick_save)
+        except ValueError:
+            # From an older version or another map, the game goes on as it was
+            self.quick_save = None
+            return
+
+        # The replay starts again from here
+        self.recorder = Recorder(self.simulation, self.simulation.level, self.quick_save)
+        self.death_timer = 0.0
+        self.camera.reset()
+        self.update_hud_texts()
+
+    # --- Event subscribers
+
+    def queue_sound(self, event):
+        """ Audio: sounds are played at the end of the frame, each one once """
+        if isinstance(event, PlayerJumped):
+            audio.play(self.jump_sound)
+        elif isinstance(event, CoinCollected):
+            audio.play(self.collect_coin_sound)
+        elif isinstance(event, PlayerHit):
+            audio.play(self.game_over)
+        elif isinstance(event, LevelCompleted):
+            audio.stop(self.game_sound)
+            audio.play(self.level_update_sound)
+
+    def start_death_pause(self, event):
+        """ Stop the music and hold the game for a bit, without blocking the window """
+        audio.stop(self.game_sound)
+        self.death_timer = DEATH_PAUSE
+
+    def update_hud_texts(self, event=None):
+        """ HUD: score and health only change on events """
+        self.score_text.set(f"Score: {self.simulation.game_score}")
+        self.health_text.set(f"Health: {self.simulation.health}")
+
+    def reset_camera(self, event):
+        """ Camera: go back to the start of the level """
+        self.camera.reset()
+
+    def finish_game(self, event):
+        self.save_replay()
+        game_over_view = GameOverView()
+        self.window.show_view(game_over_view)
+
+    def handle_events(self):
+        """ Give what happened in the simulation to the subscribers """
+        self.simulation.events.dispatch()
+
+        # The sounds of this frame, each one once
+        audio.flush()
+
+    def on_update(self, delta_time):
+        sim = self.simulation
+
+        # After dying the game waits a bit, then the music starts again
+        if self.death_timer > 0:
+            self.death_timer -= delta_time
+            if self.death_timer > 0:
+                return
+            audio.play(self.game_sound)
+
+        # Run as many fixed steps as the frame time covers
+        self.time_left_over += delta_time
+        steps = 0
+        while self.time_left_over >= UPDATE_RATE and steps < MAX_STEPS_PER_FRAME:
+            self.recorder.step(self.keys)
+            self.time_left_over -= UPDATE_RATE
+            steps += 1
+        if steps == MAX_STEPS_PER_FRAME:
+            # We are too far behind, don't try to catch up
+            self.time_left_over = 0.0
+
+        self.handle_events()
+        if sim.finished:
+            return
+
+        # Take the coins collected this frame out of the coin list, all at once
+        with profiler.scope("coins.compact"):
+            sim.coins.compact()
+
+        # Update animations
+        with profiler.scope("animation"):
+            if self.animated_coins is not sim.coins:
+                self.animated_coins = sim.coins
+                self.coin_animator = tile_animator(sim.coins.coins)
+            self.coin_animator.update(delta_time)
+            sim.background_list.update_animation(delta_time)
+            sim.player_animator.update(delta_time)
+
+        with profiler.scope("scrolling"):
+            self.camera.update(sim.player_sprite, delta_time, sim.end_of_map)
+
+            # The next ticks stream in the chunks around what is on screen
+            sim.view_rect = self.camera.visible_rect()
+
+        # The overlay only changes twice a second, so it can be read
+        self.profile_timer -= delta_time
+        if self.show_profile and self.profile_timer <= 0:
+            self.profile_timer = PROFILE_OVERLAY_INTERVAL
+            self.update_profile_overlay()
+
+    def update_profile_overlay(self):
+        """ One line per timed part of the frame, at the top left """
+        lines = profiler.lines()
+        while len(self.profile_texts) < len(lines):
+            y = 540 - 14 * len(self.profile_texts)
+            self.profile_texts.append(self.profile_hud.add(10, y, arcade.csscolor.YELLOW, 10))
+        for hud_text, line in zip(self.profile_texts, lines):
+            hud_text.set(line)
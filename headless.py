@@ -0,0 +1,11 @@
+"""
+Import this before arcade in programs that run without a window, like
+the headless simulation, the runner, the benchmark and the server.
+
+arcade opens a hidden window when it is imported, to share its OpenGL
+context with the windows that come later. That needs a display, and
+nothing here draws.
+"""
+import pyglet
+
+pyglet.options["shadow_window"] = False
@@ -0,0 +1,88 @@
+import arcade
+import PIL.Image
+import PIL.ImageDraw
+import PIL.ImageFont
+
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Fonts we try, first one found wins
+FONT_NAMES = ("arial.ttf", "Arial.ttf", "DejaVuSans.ttf")
+
+# draw_text font sizes are a bit bigger than the pixel size of the font
+FONT_SCALE = 1.25
+
+_fonts = {}
+
+
+def _font(font_size):
+    font = _fonts.get(font_size)
+    if font is None:
+        pixel_size = int(font_size * FONT_SCALE)
+        for name in FONT_NAMES:
+            try:
+                font = PIL.ImageFont.truetype(name, pixel_size)
+                break
+            except OSError:
+                pass
+        else:
+            font = PIL.ImageFont.load_default()
+        _fonts[font_size] = font
+    return font
+
+
+def text_texture(text, color, font_size):
+    """ Lay out a text once and make a texture out of it """
+    font = _font(font_size)
+    left, top, right, bottom = font.getbbox(text or " ")
+    image = PIL.Image.new("RGBA", (max(right, 1), max(bottom, 1)), (0, 0, 0, 0))
+    PIL.ImageDraw.Draw(image).text((0, 0), text, fill=tuple(color), font=font)
+    return arcade.Texture(f"hud-{font_size}-{tuple(color)}-{text}", image)
+
+
+class HudText:
+    """ One piece of text on the screen. Only laid out again when the text changes. """
+
+    def __init__(self, sprite_list, x, y, color, font_size, anchor_x="left"):
+        self.x = x
+        self.y = y
+        self.color = color
+        self.font_size = font_size
+        self.anchor_x = anchor_x
+
+        self.text = None
+        self.sprite = arcade.Sprite()
+        sprite_list.append(self.sprite)
+
+    def set(self, text):
+        if text == self.text:
+            return
+        self.text = text
+        texture = text_texture(text, self.color, self.font_size)
+        self.sprite.texture = texture
+
+        # Screen position doesn't depend on the camera. Placed from the texture size,
+        # the sprite's hit box is still the one of its first, empty texture.
+        self.sprite.center_y = self.y + texture.height / 2
+        if self.anchor_x == "center":
+            self.sprite.center_x = self.x
+        else:
+            self.sprite.center_x = self.x + texture.width / 2
+
+
+class Hud:
+    """ Texts drawn in screen space on top of everything else """
+
+    def __init__(self):
+        self.sprite_list = arcade.SpriteList()
+
+    def add(self, x, y, color, font_size, anchor_x="left", text=""):
+        hud_text = HudText(self.sprite_list, x, y, color, font_size, anchor_x)
+        hud_text.set(text)
+        return hud_text
+
+    def draw(self):
+        # Draw with a viewport at 0, 0, so scrolling doesn't move the texts
+        viewport = arcade.get_viewport()
+        arcade.set_viewport(0, SCREEN_WIDTH, 0, SCREEN_HEIGHT)
+        self.sprite_list.draw()
+        arcade.set_viewport(*viewport)
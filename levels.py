@@ -0,0 +1,144 @@
+import copy
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import arcade
+
+import bake
+from constants import TILE_SCALING, GRID_PIXEL_SIZE
+from enemies import read_enemy_spawns
+
+# Layer names in the Admap tmx files
+PLATFORMS_LAYER_NAME = 'Platforms'
+COINS_LAYER_NAME = 'Coins'
+MOVING_PLATFORMS_LAYER_NAME = 'Moving Platforms'
+LADDERS_LAYER_NAME = 'Ladders'
+DONT_TOUCH_LAYER_NAME = "Don't Touch"
+
+# How many parsed levels we keep around
+LEVEL_CACHE_SIZE = 3
+
+
+class LevelData:
+    """
+    A parsed level. The sprite lists in here are only templates, they are
+    never drawn or changed. Use copy_sprites or copy_sprite_list to get
+    sprites to play with.
+    """
+
+    def __init__(self, level, end_of_map, platforms, coins, moving_platforms, ladders, dont_touch, enemies,
+                 my_map=None):
+        self.level = level
+        self.map = my_map
+        self.end_of_map = end_of_map
+
+        self.platforms = platforms
+        self.coins = coins
+        self.moving_platforms = moving_platforms
+        self.ladders = ladders
+        self.dont_touch = dont_touch
+
+        # Where the enemies start, they are built from the pool in setup
+        self.enemies = enemies
+
+    @classmethod
+    def from_map(cls, level, my_map):
+        """ Build the layers of a map read with read_tmx """
+        return cls(
+            level,
+            end_of_map=my_map.map_size.width * GRID_PIXEL_SIZE,
+            platforms=arcade.tilemap.process_layer(my_map, PLATFORMS_LAYER_NAME, TILE_SCALING),
+            coins=arcade.tilemap.process_layer(my_map, COINS_LAYER_NAME, TILE_SCALING),
+            moving_platforms=arcade.tilemap.process_layer(my_map, MOVING_PLATFORMS_LAYER_NAME, TILE_SCALING),
+            ladders=arcade.tilemap.process_layer(my_map, LADDERS_LAYER_NAME, TILE_SCALING),
+            dont_touch=arcade.tilemap.process_layer(my_map, DONT_TOUCH_LAYER_NAME, TILE_SCALING),
+            enemies=read_enemy_spawns(my_map),
+            my_map=my_map,
+        )
+
+
+def load_tmx_level(level):
+    """ Read the tmx file of a level and build its layers """
+    my_map = arcade.tilemap.read_tmx(bake.tmx_file(level))
+    return LevelData.from_map(level, my_map)
+
+
+def load_level(level):
+    """ The baked level if `python bake.py` made one for this tmx file, else the tmx file """
+    parts = bake.read(bake.baked_file(level), level, bake.source_stamp(level))
+    if parts is None:
+        return load_tmx_level(level)
+    return LevelData(**parts)
+
+
+def copy_sprites(sprite_list):
+    """
+    A copy of every sprite in a list. Textures, hit boxes and properties
+    are shared, so this does no file or image work. Speeds are not, so
+    playing a copy doesn't change the level in the cache.
+    """
+    sprites = []
+    for sprite in sprite_list:
+        new_sprite = copy.copy(sprite)
+        new_sprite.sprite_lists = []
+        new_sprite.physics_engines = []
+        # arcade keeps change_x / change_y in these lists, a shared one would move the cached sprite too
+        new_sprite.velocity = list(sprite.velocity)
+        new_sprite.force = list(sprite.force)
+        sprites.append(new_sprite)
+    return sprites
+
+
+def copy_sprite_list(sprite_list):
+    """ New sprite list with a copy of every sprite """
+    new_list = arcade.SpriteList()
+    new_list.extend(copy_sprites(sprite_list))
+    return new_list
+
+
+class LevelCache:
+    """
+    Keeps the last few parsed levels, and can parse a level on a worker
+    thread so it is ready when the player gets there.
+
+    loader is called with a level number and returns its LevelData.
+    """
+
+    def __init__(self, max_levels=LEVEL_CACHE_SIZE, loader=load_level):
+        self.max_levels = max_levels
+        self.loader = loader
+
+        # level -> Future of LevelData, oldest first
+        self.levels = OrderedDict()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-loader")
+
+    def _future(self, level):
+        future = self.levels.get(level)
+        if future is None:
+            future = self.executor.submit(self.loader, level)
+            self.levels[level] = future
+        self.levels.move_to_end(level)
+
+        # Forget the levels we haven't used for the longest
+        while len(self.levels) > self.max_levels:
+            self.levels.popitem(last=False)
+
+        return future
+
+    def preload(self, level):
+        """ Start parsing a level in the background, if it isn't cached yet """
+        self._future(level)
+
+    def get(self, level):
+        """ LevelData for a level. Waits if it is still being parsed. """
+        future = self._future(level)
+        try:
+            return future.result()
+        except Exception:
+            # Don't keep a failed load around, so the next call tries again
+            self.levels.pop(level, None)
+            raise
+
+
+# One cache for the whole game, so a new GameView doesn't parse the maps again
+level_cache = LevelCache()
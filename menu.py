@@ -0,0 +1,75 @@
+import threading
+
+import arcade
+
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from hud import Hud
+from profiler import startup
+
+
+# Thread that gets the first level ready, started by the first menu
+_warm_up_thread = None
+
+
+def _warm_up():
+    # The game modules (NumPy, the simulation, sounds) are imported here, off the main thread
+    import game_view
+    game_view.warm_up()
+
+
+def start_warm_up():
+    """ Start the warm-up once, later menus get the same thread """
+    global _warm_up_thread
+    if _warm_up_thread is None:
+        _warm_up_thread = threading.Thread(target=_warm_up, name="warm-up", daemon=True)
+        _warm_up_thread.start()
+    return _warm_up_thread
+
+
+class MenuView(arcade.View):
+    def __init__(self):
+        super().__init__()
+        self.hud = Hud()
+        self.hud.add(SCREEN_WIDTH//2, SCREEN_HEIGHT//2, arcade.color.BLACK, 30, anchor_x="center",
+                     text="Menu Screen - SPACE to start")
+
+        # Get the first level ready while the menu is up
+        self.warm_up = start_warm_up()
+
+    def on_show(self):
+        arcade.set_background_color(arcade.color.BLUE_GREEN)
+
+    def on_draw(self):
+        arcade.start_render()
+        self.hud.draw()
+        startup.first_frame("cold start to menu")
+
+    def on_key_press(self, key, modifiers):
+        if key == arcade.key.SPACE:
+            startup.start("SPACE to first game frame")
+            self.warm_up.join()
+            from game_view import GameView
+            game_view = GameView()
+            game_view.setup()
+            self.window.show_view(game_view)
+
+
+class GameOverView(arcade.View):
+
+    def on_show(self):
+        arcade.set_background_color(arcade.color.BLACK)
+
+    def __init__(self):
+        super().__init__()
+        self.hud = Hud()
+        self.hud.add(SCREEN_WIDTH//4.2, SCREEN_HEIGHT//2, arcade.color.WHITE, 30,
+                     text="Game Over - press ESCAPE to advance")
+
+    def on_draw(self):
+        arcade.start_render()
+        self.hud.draw()
+
+    def on_key_press(self, key, _modifiers):
+        if key == arcade.key.ESCAPE:
+            menu_view = MenuView()
+            self.window.show_view(menu_view)
@@ -0,0 +1,186 @@
+import contextlib
+import struct
+import zlib
+
+import numpy as np
+
+from constants import SCREEN_WIDTH, START_HEALTH, START_TIME
+from levels import level_cache
+from simulation import GameSimulation
+
+# What each player has of their own, GameSimulation keeps these for the player being stepped
+PLAYER_FIELDS = ("player_sprite", "physics_engine", "left_pressed", "right_pressed", "up_pressed",
+                 "down_pressed", "jump_needs_reset", "game_score", "score", "health", "total_time")
+
+# level, finished, number of players, coin bytes, enemies, moving platforms
+STATE_HEADER = struct.Struct("<BBHIII")
+# player id, x, y, change_x, change_y, health, score, time left
+PLAYER_STATE = np.dtype([("id", "<u2"), ("x", "<f4"), ("y", "<f4"), ("change_x", "<f4"), ("change_y", "<f4"),
+                         ("health", "<i2"), ("score", "<i4"), ("time", "<f4")])
+
+
+class PlayerSlot:
+    """ One player of a MultiplayerSimulation """
+
+    def __init__(self, player_id):
+        self.id = player_id
+        self.keys = 0
+
+        self.player_sprite = None
+        self.physics_engine = None
+        self.left_pressed = False
+        self.right_pressed = False
+        self.up_pressed = False
+        self.down_pressed = False
+        self.jump_needs_reset = False
+        self.game_score = 0
+        self.score = 0
+        self.health = START_HEALTH
+        self.total_time = START_TIME
+
+
+class MultiplayerSimulation(GameSimulation):
+    """
+    Several players in one level. Enemies, moving platforms and coins are
+    shared. Every tick the world moves once, and the player parts of the
+    step are run for each player in turn, with that player's fields
+    swapped into the simulation.
+
+    When one player reaches the end of the map, everybody goes to the next level.
+
+    Players always get the swept physics engine. arcade's engine moves the
+    moving walls in its update, which would move them once for every player.
+    """
+
+    def __init__(self, cache=level_cache, seed=0):
+        super().__init__(cache, seed, swept_physics=True)
+
+        # player id -> PlayerSlot, in the order they joined
+        self.players = {}
+
+        # The slot whose fields are in the simulation right now
+        self.current = None
+
+    @contextlib.contextmanager
+    def playing(self, slot):
+        for name in PLAYER_FIELDS:
+            setattr(self, name, getattr(slot, name))
+        self.current = slot
+        try:
+            yield
+        finally:
+            for name in PLAYER_FIELDS:
+                setattr(slot, name, getattr(self, name))
+            self.current = None
+
+    def add_player(self, player_id):
+        slot = PlayerSlot(player_id)
+        if self.player_list is not None:
+            slot.player_sprite = self.add_player_sprite()
+            slot.physics_engine = self.make_physics_engine(slot.player_sprite)
+        self.players[player_id] = slot
+        return slot
+
+    def remove_player(self, player_id):
+        slot = self.players.pop(player_id, None)
+        if slot is not None and slot.player_sprite is not None:
+            self.remove_player_sprite(slot.player_sprite)
+
+    def setup(self, level=1):
+        super().setup(level)
+
+        # Everybody starts the level again, with new sprites for the new walls
+        self.remove_player_sprite(self.player_sprite)
+        for slot in self.players.values():
+            slot.player_sprite = self.add_player_sprite()
+            slot.physics_engine = self.make_physics_engine(slot.player_sprite)
+
+        # The player that finished the level gets the new sprite too
+        if self.current is not None:
+            self.player_sprite = self.current.player_sprite
+            self.physics_engine = self.current.physics_engine
+
+    def player_sprites(self):
+        """ Every player's sprite, enemies go after whichever is nearest and platforms carry them all """
+        return [slot.player_sprite for slot in self.players.values() if slot.player_sprite is not None]
+
+    def update_chunks(self):
+        """ Chunks around every player """
+        xs = [slot.player_sprite.center_x for slot in self.players.values() if slot.player_sprite is not None]
+        if xs:
+            self.chunks.update(min(xs) - SCREEN_WIDTH, max(xs) + SCREEN_WIDTH)
+
+    def _step(self, keys, delta_time):
+        """ keys is a dict of player id -> KEY_* bits, players not in it keep their last keys """
+        for player_id, player_keys in (keys or {}).items():
+            if player_id in self.players:
+                self.players[player_id].keys = player_keys
+
+        slots = list(self.players.values())
+        self._move_enemies()
+        for slot in slots:
+            with self.playing(slot):
+                self.set_keys(slot.keys)
+                self._move_player(delta_time)
+        self._move_walls()
+        for slot in slots:
+            with self.playing(slot):
+                self._collect_coins()
+        self._turn_enemies()
+        for slot in slots:
+            with self.playing(slot):
+                self._check_player()
+            if self.finished:
+                break
+
+
+def world_state(simulation):
+    """ What a client needs to draw a MultiplayerSimulation, the level itself it loads on its own """
+    sim = simulation
+    players = np.array([(slot.id, slot.player_sprite.center_x, slot.player_sprite.center_y,
+                         slot.player_sprite.change_x, slot.player_sprite.change_y, slot.health, slot.game_score,
+                         slot.total_time)
+                        for slot in sim.players.values()], dtype=PLAYER_STATE)
+    return b"".join((
+        STATE_HEADER.pack(sim.level, sim.finished, len(players), len(sim.coins.bits), len(sim.enemy_store),
+                          len(sim.platform_store)),
+        players.tobytes(),
+        bytes(sim.coins.bits),
+        np.stack((sim.enemy_store.x, sim.enemy_store.y)).astype("<f4").tobytes(),
+        np.stack((sim.platform_store.x, sim.platform_store.y)).astype("<f4").tobytes(),
+    ))
+
+
+def read_world_state(data):
+    """ world_state() bytes as a dict of the level, players, coin bits and enemy / platform positions """
+    level, finished, player_count, coin_bytes, enemy_count, platform_count = STATE_HEADER.unpack_from(data)
+    offset = STATE_HEADER.size
+    players = np.frombuffer(data, PLAYER_STATE, player_count, offset)
+    offset += players.nbytes
+    coin_bits = data[offset:offset + coin_bytes]
+    offset += coin_bytes
+    enemies = np.frombuffer(data, "<f4", 2 * enemy_count, offset).reshape(2, enemy_count)
+    offset += enemies.nbytes
+    platforms = np.frombuffer(data, "<f4", 2 * platform_count, offset).reshape(2, platform_count)
+    return {"level": level, "finished": bool(finished), "players": players, "coin_bits": coin_bits,
+            "enemies": enemies, "platforms": platforms}
+
+
+def delta(base, state):
+    """
+    state compressed against base, a state the other side already has and
+    of the same size. Unchanged bytes XOR to zero, and long runs of zeros
+    compress to almost nothing. With base None the whole state is sent.
+    """
+    if base is not None:
+        xored = (np.frombuffer(base, np.uint8) ^ np.frombuffer(state, np.uint8)).tobytes()
+        return zlib.compress(xored, 1)
+    return zlib.compress(state, 1)
+
+
+def undelta(base, data):
+    """ The state delta() was given, base must be the same one (None for a full state) """
+    state = zlib.decompress(data)
+    if base is not None:
+        state = (np.frombuffer(base, np.uint8) ^ np.frombuffer(state, np.uint8)).tobytes()
+    return state
@@ -0,0 +1,156 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from constants import GRID_PIXEL_SIZE, NAV_RANGE
+
+
+class NavGrid:
+    """
+    Where enemies can walk, from the Platforms and Ladders layers, and a
+    flow field toward the players over it.
+
+    A tile is walkable when it has no wall in it and a wall or ladder under
+    it, or a ladder in it. Walkers go left and right between walkable tiles
+    and up and down where there is a ladder.
+
+    The field is one breadth first search out from the players' tiles, at
+    most max_distance steps. Every tile it reaches knows which way is one
+    step closer. It is only searched again when a player gets to another
+    tile, and enemies read their way from arrays, so more enemies don't
+    mean more searching.
+    """
+
+    def __init__(self, walls, ladders, cell_size=GRID_PIXEL_SIZE, max_distance=NAV_RANGE):
+        self.cell_size = cell_size
+        self.max_distance = max_distance
+
+        # Tiles are placed by their center, the hit box can be smaller or bigger than the tile
+        wall_cells = [self.cell(sprite.center_x, sprite.center_y) for sprite in walls]
+        ladder_cells = [self.cell(sprite.center_x, sprite.center_y) for sprite in ladders]
+        cells = wall_cells + ladder_cells or [(0, 0)]
+
+        # One empty tile all around, so every tile has neighbours
+        self.col0 = min(col for col, row in cells) - 1
+        self.row0 = min(row for col, row in cells) - 1
+        self.cols = max(col for col, row in cells) - self.col0 + 2
+        self.rows = max(row for col, row in cells) - self.row0 + 2
+
+        solid = np.zeros((self.cols, self.rows), dtype=bool)
+        ladder = np.zeros((self.cols, self.rows), dtype=bool)
+        for grid, grid_cells in ((solid, wall_cells), (ladder, ladder_cells)):
+            if grid_cells:
+                cols, rows = np.array(grid_cells).T
+                grid[cols - self.col0, rows - self.row0] = True
+
+        under = np.zeros_like(solid)
+        under[:, 1:] = solid[:, :-1] | ladder[:, :-1]
+        self.walkable = ~solid & (under | ladder)
+
+        # climb[col, row]: a walker can go between this tile and the one above it
+        self.climb = np.zeros_like(solid)
+        self.climb[:, :-1] = (self.walkable[:, :-1] & self.walkable[:, 1:]
+                              & (ladder[:, :-1] | ladder[:, 1:]))
+
+        # Lists are quicker than arrays for the search, which looks at one tile at a time.
+        # Tiles are numbered col * rows + row.
+        self._walkable = self.walkable.ravel().tolist()
+        self._climb = self.climb.ravel().tolist()
+
+        # The flow field: which way to go from each tile, and whether the search got there
+        self.step_x = np.zeros((self.cols, self.rows), dtype=np.int8)
+        self.step_y = np.zeros((self.cols, self.rows), dtype=np.int8)
+        self.reached = np.zeros((self.cols, self.rows), dtype=bool)
+
+        # Tiles the field was searched from, and how many times it was
+        self.targets = None
+        self.searches = 0
+
+    def cell(self, x, y):
+        """ (column, row) of a point """
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _index(self, x, y):
+        """ Tile numbers of points as arrays of columns and rows, and which points are on the grid """
+        cols = np.floor(np.asarray(x) / self.cell_size).astype(int) - self.col0
+        rows = np.floor(np.asarray(y) / self.cell_size).astype(int) - self.row0
+        inside = (cols >= 0) & (cols < self.cols) & (rows >= 0) & (rows < self.rows)
+        return np.where(inside, cols, 0), np.where(inside, rows, 0), inside
+
+    def ground_cell(self, x, y):
+        """ Walkable tile at a point, or the first one under it when jumping. None if there is none. """
+        col, row = self.cell(x, y)
+        col -= self.col0
+        row -= self.row0
+        if not 0 <= col < self.cols:
+            return None
+        row = min(row, self.rows - 1)
+        while row >= 0:
+            if self._walkable[col * self.rows + row]:
+                return col * self.rows + row
+            row -= 1
+        return None
+
+    def is_walkable(self, x, y):
+        """ For each point, whether it is in a walkable tile """
+        cols, rows, inside = self._index(x, y)
+        return inside & self.walkable[cols, rows]
+
+    def update(self, sprites):
+        """ Search the field again if one of the sprites is in another tile than last time """
+        targets = tuple(sorted({cell for cell in (self.ground_cell(sprite.center_x, sprite.center_y)
+                                                  for sprite in sprites) if cell is not None}))
+        if targets == self.targets:
+            return False
+        self.targets = targets
+        self.searches += 1
+
+        rows = self.rows
+        walkable = self._walkable
+        climb = self._climb
+        max_distance = self.max_distance
+
+        # tile -> (distance, step x, step y)
+        seen = {target: (0, 0, 0) for target in targets}
+        queue = deque(targets)
+        while queue:
+            index = queue.popleft()
+            distance = seen[index][0] + 1
+            if distance > max_distance:
+                continue
+
+            # Each neighbour we can walk to from here goes one step back to this tile
+            neighbours = []
+            if walkable[index - rows]:
+                neighbours.append((index - rows, 1, 0))
+            if walkable[index + rows]:
+                neighbours.append((index + rows, -1, 0))
+            if climb[index]:
+                neighbours.append((index + 1, 0, -1))
+            if climb[index - 1]:
+                neighbours.append((index - 1, 0, 1))
+            for neighbour, step_x, step_y in neighbours:
+                if neighbour not in seen:
+                    seen[neighbour] = (distance, step_x, step_y)
+                    queue.append(neighbour)
+
+        self.step_x.fill(0)
+        self.step_y.fill(0)
+        self.reached.fill(False)
+        if seen:
+            indexes = np.fromiter(seen.keys(), dtype=int, count=len(seen))
+            steps = np.array(list(seen.values()), dtype=int)
+            self.step_x.ravel()[indexes] = steps[:, 1]
+            self.step_y.ravel()[indexes] = steps[:, 2]
+            self.reached.ravel()[indexes] = True
+        return True
+
+    def directions(self, x, y):
+        """
+        For each point, the step toward the nearest player as (step_x, step_y,
+        reached). Steps are -1, 0 or 1. Points the search didn't reach, or
+        that are off the grid, have reached False.
+        """
+        cols, rows, inside = self._index(x, y)
+        return self.step_x[cols, rows], self.step_y[cols, rows], inside & self.reached[cols, rows]
@@ -0,0 +1,279 @@
+import argparse
+import asyncio
+import random
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+import headless  # noqa: F401, before arcade: the server runs without a display
+from constants import (UPDATE_RATE, MAX_STEPS_PER_FRAME, NET_PORT, NET_SNAPSHOT_INTERVAL, NET_HISTORY,
+                       NET_TIMEOUT)
+from multiplayer import MultiplayerSimulation, world_state, read_world_state, delta, undelta
+
+# Message types, the first byte of every datagram
+HELLO = 1
+WELCOME = 2
+INPUT = 3
+SNAPSHOT = 4
+BYE = 5
+
+# type, player id
+WELCOME_MESSAGE = struct.Struct("<BH")
+# type, last snapshot tick received, KEY_* bits
+INPUT_MESSAGE = struct.Struct("<BIB")
+# type, tick, tick of the base it is a delta of (0 for a full state), then the delta
+SNAPSHOT_MESSAGE = struct.Struct("<BII")
+
+
+class ClientInfo:
+    def __init__(self, player_id):
+        self.player_id = player_id
+
+        # Newest snapshot tick the client said it has, 0 for none
+        self.ack = 0
+        self.last_heard = time.monotonic()
+
+
+class GameServer(asyncio.DatagramProtocol):
+    """
+    Runs a MultiplayerSimulation at the fixed tick rate. Clients send the
+    keys they hold, the server sends back the world every few ticks, as a
+    delta of the last snapshot the client acknowledged.
+    """
+
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self.transport = None
+
+        # address -> ClientInfo
+        self.clients = {}
+        self.next_player_id = 1
+
+        # tick -> world state sent at that tick, the newest NET_HISTORY
+        self.history = OrderedDict()
+        self.tick = 0
+
+        # Bytes sent and how many of them were full states, for the stats
+        self.bytes_sent = 0
+        self.full_states = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, address):
+        if not data:
+            return
+        client = self.clients.get(address)
+
+        if data[0] == HELLO:
+            if client is None:
+                client = self.clients[address] = ClientInfo(self.next_player_id)
+                self.next_player_id += 1
+                self.simulation.add_player(client.player_id)
+            self.transport.sendto(WELCOME_MESSAGE.pack(WELCOME, client.player_id), address)
+        elif client is None:
+            return
+        elif data[0] == INPUT and len(data) >= INPUT_MESSAGE.size:
+            _, ack, keys = INPUT_MESSAGE.unpack_from(data)
+            self.simulation.players[client.player_id].keys = keys
+            client.ack = max(client.ack, ack)
+            client.last_heard = time.monotonic()
+        elif data[0] == BYE:
+            self.drop(address)
+
+    def drop(self, address):
+        client = self.clients.pop(address, None)
+        if client is not None:
+            self.simulation.remove_player(client.player_id)
+
+    def send_snapshots(self):
+        state = world_state(self.simulation)
+        self.history[self.tick] = state
+        while len(self.history) > NET_HISTORY:
+            self.history.popitem(last=False)
+
+        for address, client in self.clients.items():
+            base = self.history.get(client.ack)
+            if base is None or len(base) != len(state):
+                # The client has nothing we can use, it gets the whole state
+                base_tick = 0
+                base = None
+                self.full_states += 1
+            else:
+                base_tick = client.ack
+            message = SNAPSHOT_MESSAGE.pack(SNAPSHOT, self.tick, base_tick) + delta(base, state)
+            self.transport.sendto(message, address)
+            self.bytes_sent += len(message)
+
+    def step(self):
+        self.tick += 1
+        self.simulation.step({})
+        self.simulation.events.clear()
+        if self.tick % NET_SNAPSHOT_INTERVAL == 0:
+            self.send_snapshots()
+
+        now = time.monotonic()
+        for address in [address for address, client in self.clients.items()
+                        if now - client.last_heard > NET_TIMEOUT]:
+            self.drop(address)
+
+    async def run(self, seconds=None):
+        """ Tick at UPDATE_RATE until the game is over, or for a number of seconds """
+        loop = asyncio.get_running_loop()
+        start = next_tick = loop.time()
+        while not self.simulation.finished and (seconds is None or loop.time() - start < seconds):
+            steps = 0
+            while loop.time() >= next_tick and steps < MAX_STEPS_PER_FRAME:
+                self.step()
+                next_tick += UPDATE_RATE
+                steps += 1
+            if steps == MAX_STEPS_PER_FRAME:
+                # Too far behind, don't try to catch up
+                next_tick = loop.time()
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+        # Let the clients see how it ended
+        self.send_snapshots()
+
+
+class GameClient(asyncio.DatagramProtocol):
+    """
+    Talks to a GameServer. Keeps the snapshots it got with the time they
+    came in, so a view can draw the world a little in the past, between
+    two snapshots.
+    """
+
+    def __init__(self):
+        self.transport = None
+        self.player_id = None
+
+        # tick -> world state bytes, the newest NET_HISTORY, bases for the next deltas
+        self.states = OrderedDict()
+        self.newest_tick = 0
+
+        # (time it came in, read_world_state dict), oldest first. The network thread adds to it
+        # while the window's thread reads it, so both hold the lock.
+        self.snapshots = []
+        self.lock = threading.Lock()
+
+        self.bytes_received = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.sendto(bytes([HELLO]))
+
+    def datagram_received(self, data, address):
+        self.bytes_received += len(data)
+        if data[0] == WELCOME:
+            _, self.player_id = WELCOME_MESSAGE.unpack_from(data)
+        elif data[0] == SNAPSHOT:
+            _, tick, base_tick = SNAPSHOT_MESSAGE.unpack_from(data)
+            if tick <= self.newest_tick:
+                # Late or repeated, we have newer
+                return
+            base = None
+            if base_tick:
+                base = self.states.get(base_tick)
+                if base is None:
+                    return
+            state = undelta(base, data[SNAPSHOT_MESSAGE.size:])
+
+            self.states[tick] = state
+            while len(self.states) > NET_HISTORY:
+                self.states.popitem(last=False)
+            self.newest_tick = tick
+            snapshot = (time.monotonic(), read_world_state(state))
+            with self.lock:
+                self.snapshots.append(snapshot)
+                del self.snapshots[:-NET_HISTORY]
+
+    def send_keys(self, keys):
+        if self.transport is None:
+            return
+        if self.player_id is None:
+            # The HELLO may have been lost, ask again
+            self.transport.sendto(bytes([HELLO]))
+        else:
+            self.transport.sendto(INPUT_MESSAGE.pack(INPUT, self.newest_tick, keys))
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.sendto(bytes([BYE]))
+            self.transport.close()
+
+    def around(self, render_time):
+        """ The two snapshots around a time and how far between them it is (0..1) """
+        with self.lock:
+            snapshots = list(self.snapshots)
+        if not snapshots:
+            return None, None, 0.0
+        for (time0, state0), (time1, state1) in zip(snapshots, snapshots[1:]):
+            if time0 <= render_time < time1:
+                return state0, state1, (render_time - time0) / (time1 - time0)
+        if render_time < snapshots[0][0]:
+            return snapshots[0][1], snapshots[0][1], 0.0
+        return snapshots[-1][1], snapshots[-1][1], 0.0
+
+
+async def serve(port=NET_PORT, seconds=None):
+    simulation = MultiplayerSimulation()
+    simulation.setup(1)
+    server = GameServer(simulation)
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: server, local_addr=("127.0.0.1", port))
+    try:
+        await server.run(seconds)
+    finally:
+        transport.close()
+    return server
+
+
+async def play_bot(host="127.0.0.1", port=NET_PORT, seconds=10.0, seed=0):
+    """ A client without a window that holds random keys, for testing the server """
+    # The same random input the headless runner uses
+    from runner import random_keys
+
+    keys = random_keys(random.Random(seed))
+    client = GameClient()
+    loop = asyncio.get_running_loop()
+    await loop.create_datagram_endpoint(lambda: client, remote_addr=(host, port))
+    start = loop.time()
+    while loop.time() - start < seconds:
+        client.send_keys(next(keys))
+        await asyncio.sleep(UPDATE_RATE)
+    client.close()
+    return client
+
+
+async def run_bots(bots, seconds, port):
+    """ A server and some bots in one process """
+    server_task = asyncio.ensure_future(serve(port, seconds + 1.0))
+    await asyncio.sleep(0.2)
+    clients = await asyncio.gather(*[play_bot("127.0.0.1", port, seconds, seed) for seed in range(bots)])
+    server = await server_task
+
+    print(f"{server.tick} ticks, {len(clients)} bots, {server.bytes_sent} bytes sent "
+          f"({server.bytes_sent / seconds / max(len(clients), 1) / 1024:.1f} KB/s per client), "
+          f"{server.full_states} full states")
+    for client in clients:
+        print(f"player {client.player_id}: newest tick {client.newest_tick}, "
+              f"{client.bytes_received} bytes received")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multiplayer server, or a server with bots to test it")
+    parser.add_argument("--port", type=int, default=NET_PORT)
+    parser.add_argument("--bots", type=int, help="run this many bots against a local server and print the traffic")
+    parser.add_argument("--seconds", type=float, default=10.0, help="how long the bots play")
+    args = parser.parse_args()
+
+    if args.bots:
+        asyncio.run(run_bots(args.bots, args.seconds, args.port))
+    else:
+        print(f"Serving on 127.0.0.1:{args.port}")
+        asyncio.run(serve(args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+from constants import GRAVITY
+
+# Boxes closer than this count as touching
+EPSILON = 0.01
+
+
+def sprite_box(sprite):
+    return sprite.left, sprite.bottom, sprite.right, sprite.top
+
+
+class SweptPhysicsEngine:
+    """
+    Platformer physics that moves the player along each axis in one sweep,
+    using the tile grids to find what is in the way. Works like
+    arcade.PhysicsEnginePlatformer, but a fast player can't go through a
+    thin wall, and the cost only depends on the tiles the player moves over.
+
+    Walls use their box, not their hit box polygon. Moving walls are moved
+    by the simulation, which also carries and pushes the player with them.
+    """
+
+    def __init__(self, player_sprite, wall_grid, ladder_grid=None, gravity_constant=GRAVITY):
+        self.player_sprite = player_sprite
+        self.wall_grid = wall_grid
+        self.ladder_grid = ladder_grid
+        self.gravity_constant = gravity_constant
+
+        # Boxes of static walls and ladders, they never change
+        self.boxes = {}
+
+        # Contacts found in the last update
+        self.on_ladder = False
+
+        # Box covering everything the player went through in the last update
+        self.swept_box = sprite_box(player_sprite)
+
+    def box(self, sprite, grid):
+        if id(sprite) in grid.moving:
+            return sprite_box(sprite)
+        box = self.boxes.get(id(sprite))
+        if box is None:
+            box = self.boxes[id(sprite)] = sprite_box(sprite)
+        return box
+
+    def boxes_in(self, grid, left, bottom, right, top):
+        """ Boxes of the sprites of a grid that overlap a box """
+        found = []
+        for sprite in grid.in_box(left, bottom, right, top):
+            box = self.box(sprite, grid)
+            if box[0] < right and box[2] > left and box[1] < top and box[3] > bottom:
+                found.append((sprite, box))
+        return found
+
+    def is_on_ladder(self):
+        if self.ladder_grid is None:
+            return False
+        return len(self.boxes_in(self.ladder_grid, *sprite_box(self.player_sprite))) > 0
+
+    def can_jump(self, y_distance=5):
+        """ True if there is a wall right under the player """
+        left, bottom, right, top = sprite_box(self.player_sprite)
+        below = self.boxes_in(self.wall_grid, left + EPSILON, bottom - y_distance, right - EPSILON, bottom + EPSILON)
+        return len(below) > 0
+
+    def swept_hits(self, grid):
+        """ Sprites of a grid the player touched anywhere on the way in the last update """
+        return [sprite for sprite, box in self.boxes_in(grid, *self.swept_box)]
+
+    def update(self):
+        player = self.player_sprite
+        start_left, start_bottom, start_right, start_top = sprite_box(player)
+
+        self.on_ladder = self.is_on_ladder()
+        if not self.on_ladder:
+            player.change_y -= self.gravity_constant
+
+        # --- Up / down
+        left, bottom, right, top = sprite_box(player)
+        dy = player.change_y
+        if dy < 0:
+            # Highest wall top between our feet and where they will be
+            best = None
+            for sprite, box in self.boxes_in(self.wall_grid, left + EPSILON, bottom + dy,
+                                             right - EPSILON, bottom + EPSILON):
+                if box[3] <= bottom + EPSILON and (best is None or box[3] > best[1][3]):
+                    best = (sprite, box)
+            if best is None:
+                player.center_y += dy
+            else:
+                player.center_y += best[1][3] - bottom
+                player.change_y = 0
+        elif dy > 0:
+            # Lowest wall bottom between our head and where it will be
+            best = None
+            for sprite, box in self.boxes_in(self.wall_grid, left + EPSILON, top - EPSILON,
+                                             right - EPSILON, top + dy):
+                if box[1] >= top - EPSILON and (best is None or box[1] < best[1][1]):
+                    best = (sprite, box)
+            if best is None:
+                player.center_y += dy
+            else:
+                player.center_y += best[1][1] - top
+                player.change_y = 0
+
+        # --- Left / right
+        left, bottom, right, top = sprite_box(player)
+        dx = player.change_x
+        if dx > 0:
+            nearest = None
+            for sprite, box in self.boxes_in(self.wall_grid, right - EPSILON, bottom + EPSILON,
+                                             right + dx, top - EPSILON):
+                if box[0] >= right - EPSILON and (nearest is None or box[0] < nearest):
+                    nearest = box[0]
+            player.center_x += dx if nearest is None else nearest - right
+        elif dx < 0:
+            nearest = None
+            for sprite, box in self.boxes_in(self.wall_grid, left + dx, bottom + EPSILON,
+                                             left + EPSILON, top - EPSILON):
+                if box[2] <= left + EPSILON and (nearest is None or box[2] > nearest):
+                    nearest = box[2]
+            player.center_x += dx if nearest is None else nearest - left
+
+        end_left, end_bottom, end_right, end_top = sprite_box(player)
+        self.swept_box = (min(start_left, end_left), min(start_bottom, end_bottom),
+                          max(start_right, end_right), max(start_top, end_top))
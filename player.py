@@ -0,0 +1,99 @@
+import arcade
+import numpy as np
+
+from animation import Animation, Animator
+from assets import assets
+from constants import (CHARACTER_SCALING, RIGHT_FACING, LEFT_FACING, PLAYER_WALK_FRAME_TIME,
+                       PLAYER_CLIMB_FRAME_TIME)
+
+MAIN_PATH = ":resources:images/animated_characters/male_person/malePerson"
+
+# Every frame of the player, packed in one atlas
+PLAYER_FRAMES = ([f"{MAIN_PATH}_{name}.png" for name in ("idle", "jump", "fall")]
+                 + [f"{MAIN_PATH}_walk{i}.png" for i in range(8)]
+                 + [f"{MAIN_PATH}_climb{i}.png" for i in range(2)])
+assets.use_atlas("player", PLAYER_FRAMES)
+
+# Animation states, in the order of the animation table
+IDLE = 0
+WALK = 1
+JUMP = 2
+FALL = 3
+CLIMB = 4
+
+
+def load_texture_pair(filename):
+    return assets.texture_pair(filename)
+
+
+def choose_player_states(sprites, faces):
+    """ Animation state, facing and moving flag of every player, from how they move """
+    # The facing lives on the sprite, so a restored snapshot keeps it
+    faces = np.array([sprite.character_face_direction for sprite in sprites], dtype=int)
+    change_x = np.array([sprite.change_x for sprite in sprites], dtype=float)
+    change_y = np.array([sprite.change_y for sprite in sprites], dtype=float)
+    on_ladder = np.array([sprite.is_on_ladder for sprite in sprites], dtype=bool)
+
+    faces = np.where(change_x < 0, LEFT_FACING, np.where(change_x > 0, RIGHT_FACING, faces))
+    states = np.select([on_ladder, change_y > 0, change_y < 0, change_x == 0], [CLIMB, JUMP, FALL, IDLE], WALK)
+
+    # Climbing only moves on while going up or down the ladder
+    moving = np.abs(change_y) > 1
+
+    for sprite, face, climbing in zip(sprites, faces.tolist(), on_ladder.tolist()):
+        sprite.character_face_direction = face
+        sprite.climbing = climbing
+    return states, faces, moving
+
+
+# The frames of every state, made the first time a player is animated
+_animations = None
+
+
+def player_animations():
+    """ Animation table of the player, in the order of the states """
+    global _animations
+    if _animations is None:
+        idle = load_texture_pair(f"{MAIN_PATH}_idle.png")
+        jump = load_texture_pair(f"{MAIN_PATH}_jump.png")
+        fall = load_texture_pair(f"{MAIN_PATH}_fall.png")
+        walk = [load_texture_pair(f"{MAIN_PATH}_walk{i}.png") for i in range(8)]
+        climb = [assets.texture(f"{MAIN_PATH}_climb{i}.png") for i in range(2)]
+
+        animations = [None] * 5
+        animations[IDLE] = Animation([idle[RIGHT_FACING]], [1], [idle[LEFT_FACING]])
+        animations[WALK] = Animation([pair[RIGHT_FACING] for pair in walk], [PLAYER_WALK_FRAME_TIME] * len(walk),
+                                     [pair[LEFT_FACING] for pair in walk])
+        animations[JUMP] = Animation([jump[RIGHT_FACING]], [1], [jump[LEFT_FACING]])
+        animations[FALL] = Animation([fall[RIGHT_FACING]], [1], [fall[LEFT_FACING]])
+        animations[CLIMB] = Animation(climb, [PLAYER_CLIMB_FRAME_TIME] * len(climb), moving_only=True)
+        _animations = animations
+    return _animations
+
+
+def player_animator(sprites=()):
+    """ One Animator for all the players of a level """
+    return Animator(sprites, player_animations(), choose_states=choose_player_states)
+
+
+class PlayerCharacter(arcade.Sprite):
+    """ The player. Its frames are picked by the simulation's player_animator, together with the other players. """
+
+    def __init__(self):
+
+        # Set up parent class
+        super().__init__()
+
+        # Default to face-right
+        self.character_face_direction = RIGHT_FACING
+
+        self.scale = CHARACTER_SCALING
+
+        # Track our state
+        self.jumping = False
+        self.climbing = False
+        self.is_on_ladder = False
+
+        # Initial texture
+        self.texture = player_animations()[IDLE].faces[RIGHT_FACING][0]
+        # self.set_hit_box(self.texture.hit_box_points)
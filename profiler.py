@@ -0,0 +1,119 @@
+import contextlib
+import csv
+import json
+import time
+from collections import deque
+
+# How many samples per scope we keep, about 10 seconds at 60 ticks a second
+PROFILE_WINDOW = 600
+
+
+def percentile(sorted_values, fraction):
+    """ Value at a fraction (0..1) of a sorted list, nearest rank """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class Profiler:
+    """
+    Times named parts of the game loop and keeps the last PROFILE_WINDOW
+    times of each, so we can look at p50 / p95 / p99.
+    """
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self.window = window
+        self.enabled = True
+
+        # name -> last times in seconds, in the order the scopes were first used
+        self.samples = {}
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def scope(self, name):
+        """ with profiler.scope("physics"): ... """
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._timed(name)
+
+    def add(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def clear(self):
+        self.samples.clear()
+
+    def report(self):
+        """ name -> count, mean, p50, p95, p99 and max, times in milliseconds """
+        report = {}
+        for name, samples in self.samples.items():
+            values = sorted(samples)
+            report[name] = {
+                "count": len(values),
+                "mean_ms": sum(values) / len(values) * 1000 if values else 0.0,
+                "p50_ms": percentile(values, 0.50) * 1000,
+                "p95_ms": percentile(values, 0.95) * 1000,
+                "p99_ms": percentile(values, 0.99) * 1000,
+                "max_ms": values[-1] * 1000 if values else 0.0,
+            }
+        return report
+
+    def lines(self):
+        """ One short line per scope, for the overlay """
+        return [f"{name:<16} p50 {row['p50_ms']:6.3f}  p95 {row['p95_ms']:6.3f}  p99 {row['p99_ms']:6.3f} ms"
+                for name, row in self.report().items()]
+
+    def write_json(self, path):
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2, sort_keys=True)
+
+    def write_csv(self, path):
+        report = self.report()
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["scope", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+            for name, row in report.items():
+                writer.writerow([name, row["count"], row["mean_ms"], row["p50_ms"], row["p95_ms"],
+                                 row["p99_ms"], row["max_ms"]])
+
+    def write(self, path):
+        """ CSV if the path ends in .csv, JSON otherwise """
+        if path.endswith(".csv"):
+            self.write_csv(path)
+        else:
+            self.write_json(path)
+
+
+class StartupTimer:
+    """ Time from a start (launch, pressing SPACE) to the first frame drawn after it, printed once """
+
+    def __init__(self):
+        # name -> perf_counter() at the start, until its first frame
+        self.started = {}
+
+        # name -> seconds to the first frame
+        self.results = {}
+
+    def start(self, name, at=None):
+        self.started[name] = time.perf_counter() if at is None else at
+
+    def first_frame(self, name):
+        start = self.started.pop(name, None)
+        if start is None:
+            return
+        self.results[name] = time.perf_counter() - start
+        print(f"{name}: {self.results[name] * 1000:.0f} ms")
+
+
+# One profiler for the whole game
+profiler = Profiler()
+startup = StartupTimer()
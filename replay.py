@@ -0,0 +1,155 @@
+import struct
+import sys
+import time
+
+import headless  # noqa: F401, before arcade: replays run without a display
+import snapshot
+from simulation import GameSimulation
+
+# Where the game writes the replay of the last game
+REPLAY_FILE = "last_game.rpl"
+
+MAGIC = b"2DRP"
+# 4: enemies chase and turn at edges. 5: moving walls only move in the simulation.
+# 6: with arcade's engine, it moves the moving walls again. Older replays don't play the same any more.
+VERSION = 6
+
+# Bits of the flags byte
+FLAG_SWEPT_PHYSICS = 1
+
+# Save a checksum of the game state every this many ticks
+CHECKSUM_INTERVAL = 60
+
+# magic, version, flags, seed, start level, number of key runs, number of checksums, start snapshot size
+HEADER = struct.Struct("<4sBBIBIII")
+# keys, how many ticks in a row they were held
+RUN = struct.Struct("<BH")
+# tick, checksum after that tick
+CHECK = struct.Struct("<II")
+
+
+class Recording:
+    """ Keys held down in every tick of a game, with the seed and level it started with """
+
+    def __init__(self, seed=0, level=1, swept_physics=False, start_state=b""):
+        self.seed = seed
+        self.level = level
+        self.swept_physics = swept_physics
+
+        # Snapshot to start from, empty to start at the beginning of the level
+        self.start_state = start_state
+
+        # KEY_* bits for every tick
+        self.keys = bytearray()
+
+        # (tick, checksum) pairs, to find where a replay goes different
+        self.checksums = []
+
+    def runs(self):
+        """ The keys as (keys, count) pairs, the same keys are usually held for a while """
+        runs = []
+        for keys in self.keys:
+            if runs and runs[-1][0] == keys and runs[-1][1] < 0xFFFF:
+                runs[-1][1] += 1
+            else:
+                runs.append([keys, 1])
+        return runs
+
+    def to_bytes(self):
+        runs = self.runs()
+        flags = FLAG_SWEPT_PHYSICS if self.swept_physics else 0
+        parts = [HEADER.pack(MAGIC, VERSION, flags, self.seed, self.level, len(runs), len(self.checksums),
+                             len(self.start_state))]
+        parts.extend(RUN.pack(keys, count) for keys, count in runs)
+        parts.extend(CHECK.pack(tick, checksum) for tick, checksum in self.checksums)
+        parts.append(self.start_state)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, flags, seed, level, run_count, check_count, state_size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a replay file, or one from another version")
+
+        recording = cls(seed, level, bool(flags & FLAG_SWEPT_PHYSICS))
+        offset = HEADER.size
+        for keys, count in RUN.iter_unpack(data[offset:offset + run_count * RUN.size]):
+            recording.keys.extend(bytes([keys]) * count)
+        offset += run_count * RUN.size
+        recording.checksums = list(CHECK.iter_unpack(data[offset:offset + check_count * CHECK.size]))
+        offset += check_count * CHECK.size
+        recording.start_state = data[offset:offset + state_size]
+        return recording
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+class Recorder:
+    """ Steps a simulation and records the keys of every tick """
+
+    def __init__(self, simulation, level=1, start_state=b""):
+        self.simulation = simulation
+        self.recording = Recording(simulation.seed, level, simulation.swept_physics, start_state)
+
+    def step(self, keys):
+        if self.simulation.finished:
+            return
+        self.simulation.step(keys)
+        self.recording.keys.append(keys)
+
+        tick = len(self.recording.keys)
+        if tick % CHECKSUM_INTERVAL == 0 or self.simulation.finished:
+            self.recording.checksums.append((tick, self.simulation.checksum()))
+
+    def save(self, path=REPLAY_FILE):
+        # Always end with the state of the last tick
+        tick = len(self.recording.keys)
+        if tick and (not self.recording.checksums or self.recording.checksums[-1][0] != tick):
+            self.recording.checksums.append((tick, self.simulation.checksum()))
+        self.recording.save(path)
+
+
+def replay(recording):
+    """ Play a recording headless. Returns the first tick where the game went different, or None. """
+    simulation = GameSimulation(seed=recording.seed, swept_physics=recording.swept_physics)
+    simulation.setup(recording.level)
+    if recording.start_state:
+        snapshot.restore(simulation, recording.start_state)
+    checksums = dict(recording.checksums)
+
+    for tick, keys in enumerate(recording.keys, 1):
+        simulation.step(keys)
+        simulation.events.clear()
+        expected = checksums.get(tick)
+        if expected is not None and simulation.checksum() != expected:
+            return tick
+    return None
+
+
+def main():
+    """ Replay a file and check it still plays the same. Exit code 1 if it doesn't. """
+    path = sys.argv[1] if len(sys.argv) > 1 else REPLAY_FILE
+    recording = Recording.load(path)
+
+    start = time.perf_counter()
+    bad_tick = replay(recording)
+    seconds = time.perf_counter() - start
+
+    ticks = len(recording.keys)
+    print(f"{ticks} ticks in {seconds:.2f}s ({ticks / max(seconds, 1e-9):.0f} ticks/s)")
+    if bad_tick is None:
+        print("Replay matches")
+    else:
+        print(f"Replay differs at tick {bad_tick}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
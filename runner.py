@@ -0,0 +1,181 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import headless  # noqa: F401, before arcade: the runner runs without a display
+from constants import UPDATE_RATE, LAST_LEVEL
+from events import CoinCollected, PlayerHit, PlayerDied, LevelCompleted, GameFinished
+from levels import level_cache
+from profiler import profiler
+from simulation import GameSimulation, KEY_LEFT, KEY_RIGHT, KEY_UP, KEY_DOWN
+
+# Version of the JSON we write, change it when the fields change
+RESULT_VERSION = 1
+
+# Give up on a run after this many ticks (10 minutes of game time)
+MAX_TICKS = 36000
+
+POLICIES = ("scripted", "random")
+
+
+def scripted_keys(rng):
+    """ Run right and jump every half second. Doesn't use rng. """
+    tick = 0
+    while True:
+        yield KEY_RIGHT | KEY_UP if tick % 30 < 15 else KEY_RIGHT
+        tick += 1
+
+
+def random_keys(rng):
+    """ Random keys held for a random time, going right more often than left """
+    while True:
+        keys = rng.choice((KEY_RIGHT, KEY_RIGHT | KEY_UP, KEY_RIGHT, KEY_LEFT, KEY_UP, KEY_DOWN, 0))
+        for _ in range(rng.randint(5, 60)):
+            yield keys
+
+
+def play(level, seed, policy, max_ticks=MAX_TICKS):
+    """ Play one game headless from a level until the end of the game, and return its stats """
+    simulation = GameSimulation(seed=seed)
+    simulation.setup(level)
+
+    stats = {
+        "level": level,
+        "seed": seed,
+        "policy": policy,
+        "coins": 0,
+        "hits": 0,
+        "deaths": 0,
+        # Ticks when each level was finished
+        "level_ticks": [],
+    }
+
+    # The input has its own random numbers, so it doesn't change the game's
+    keys = (scripted_keys if policy == "scripted" else random_keys)(random.Random(seed))
+
+    start = time.perf_counter()
+    tick = 0
+    while tick < max_ticks and not simulation.finished:
+        simulation.step(next(keys))
+        tick += 1
+        for event in simulation.events.dispatch():
+            if isinstance(event, CoinCollected):
+                stats["coins"] += 1
+            elif isinstance(event, PlayerHit):
+                stats["hits"] += 1
+            elif isinstance(event, PlayerDied):
+                stats["deaths"] += 1
+            elif isinstance(event, (LevelCompleted, GameFinished)):
+                stats["level_ticks"].append(tick)
+
+    stats["ticks"] = tick
+    stats["game_seconds"] = round(tick * UPDATE_RATE, 3)
+    stats["finished"] = simulation.finished
+    stats["score"] = simulation.game_score
+    stats["run_seconds"] = round(time.perf_counter() - start, 6)
+    return stats
+
+
+def play_shard(jobs, max_ticks):
+    """ Play a list of (level, seed, policy) jobs in one worker """
+    return [play(level, seed, policy, max_ticks) for level, seed, policy in jobs]
+
+
+def start_worker():
+    """ Parse every level into the level cache. Nobody reads the profiler's times in a worker, so it is off. """
+    profiler.enabled = False
+    for level in range(1, LAST_LEVEL + 1):
+        level_cache.get(level)
+
+
+def summarize(runs):
+    """ Averages for each start level and policy """
+    groups = {}
+    for run in runs:
+        groups.setdefault(f"level{run['level']}_{run['policy']}", []).append(run)
+
+    summary = {}
+    for name, group in sorted(groups.items()):
+        finished = [run for run in group if run["finished"]]
+        summary[name] = {
+            "runs": len(group),
+            "finished": len(finished),
+            "mean_coins": round(sum(run["coins"] for run in group) / len(group), 2),
+            "mean_deaths": round(sum(run["deaths"] for run in group) / len(group), 2),
+            "mean_hits": round(sum(run["hits"] for run in group) / len(group), 2),
+            # Only the runs that got to the end
+            "mean_finish_seconds": (round(sum(run["game_seconds"] for run in finished) / len(finished), 3)
+                                    if finished else None),
+        }
+    return summary
+
+
+def make_jobs(levels, seeds, policies=POLICIES):
+    """ (level, seed, policy) for every run. The scripted input is the same for every seed, so it runs once. """
+    seeds = list(seeds)
+    return [(level, seed, policy) for level in levels for policy in policies
+            for seed in (seeds[:1] if policy == "scripted" else seeds)]
+
+
+def run_all(levels, seeds, policies=POLICIES, workers=None, max_ticks=MAX_TICKS):
+    """ Play every level, seed and policy on all cores and merge the stats into one report """
+    workers = workers or os.cpu_count() or 1
+    jobs = make_jobs(levels, seeds, policies)
+
+    # Every worker gets a slice of the jobs. Dealing them out in turn mixes long and short levels.
+    shards = [jobs[i::workers] for i in range(workers)]
+    shards = [shard for shard in shards if shard]
+
+    # Each worker loads the levels itself, from the baked files when there are some. Forking
+    # would copy the level cache without the thread that loads levels in the background.
+    context = multiprocessing.get_context("spawn")
+
+    start = time.perf_counter()
+    runs = []
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=context, initializer=start_worker) as executor:
+        for shard_runs in executor.map(play_shard, shards, [max_ticks] * len(shards)):
+            runs.extend(shard_runs)
+    seconds = time.perf_counter() - start
+
+    ticks = sum(run["ticks"] for run in runs)
+    runs.sort(key=lambda run: (run["level"], run["policy"], run["seed"]))
+    return {
+        "version": RESULT_VERSION,
+        "workers": len(shards),
+        "wall_seconds": round(seconds, 3),
+        "ticks_per_second": round(ticks / max(seconds, 1e-9), 1),
+        "summary": summarize(runs),
+        "runs": runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many headless games on all cores and report the stats")
+    parser.add_argument("--levels", type=int, nargs="+", default=list(range(1, LAST_LEVEL + 1)),
+                        help="levels to start from")
+    parser.add_argument("--seeds", type=int, default=8,
+                        help="how many seeds for each level with the random input, the scripted one runs once")
+    parser.add_argument("--policy", choices=POLICIES, action="append", help="input to play with (default both)")
+    parser.add_argument("--workers", type=int, help="processes to use (default one per core)")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS, help="give up on a run after this many ticks")
+    parser.add_argument("--output", default="runs.json", help="where to write the report")
+    args = parser.parse_args()
+
+    report = run_all(args.levels, range(args.seeds), tuple(args.policy or POLICIES), args.workers,
+                     args.max_ticks)
+    for name, row in report["summary"].items():
+        print(f"{name:>18}: {row['finished']}/{row['runs']} finished, {row['mean_coins']} coins, "
+              f"{row['mean_deaths']} deaths")
+    print(f"{report['workers']} workers, {report['wall_seconds']}s, {report['ticks_per_second']:.0f} ticks/s")
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
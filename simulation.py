@@ -0,0 +1,530 @@
+import argparse
+import random
+import struct
+import time
+import zlib
+
+import headless  # noqa: F401, before arcade: the simulation runs without a display
+import arcade
+import numpy as np
+
+from assets import assets
+from chunks import LevelChunks
+from coins import CoinStore
+from constants import (GRAVITY, PLAYER_MOVEMENT_SPEED, PLAYER_JUMP_SPEED, PLAYER_START_X, PLAYER_START_Y,
+                       SCREEN_WIDTH, SWEPT_PHYSICS, CHUNK_WIDTH, UPDATE_RATE, LAST_LEVEL, START_HEALTH, START_TIME)
+from enemies import enemy_pool
+from entities import EntityStore, CellMap
+from events import (EventBus, PlayerJumped, CoinCollected, PlayerHit, PlayerDied, LevelCompleted,
+                    GameFinished)
+from levels import level_cache, copy_sprites, copy_sprite_list
+from navigation import NavGrid
+from physics import SweptPhysicsEngine
+from player import PlayerCharacter, player_animator
+from profiler import profiler
+from spatial import TileGrid
+
+# A player this close above a moving wall stands on it, in pixels
+PLATFORM_CONTACT = 1.0
+
+# Walls less than this far into the bottom or top of an enemy are its floor or ceiling, not in its way
+ENEMY_FLOOR_CONTACT = 1.0
+
+# Keys held down in a tick, as bits
+KEY_LEFT = 1
+KEY_RIGHT = 2
+KEY_UP = 4
+KEY_DOWN = 8
+
+
+class GameSimulation:
+    """
+    Game state and rules, without any window, drawing or sound.
+
+    Call step() once per fixed tick with the keys held down. Things the
+    view should react to (sounds, camera resets) are emitted as events on
+    self.events. The same seed and keys always give the same game.
+    """
+
+    def __init__(self, cache=level_cache, seed=0, swept_physics=SWEPT_PHYSICS):
+
+        # Parsed levels, shared between games
+        self.level_cache = cache
+
+        # Which physics engine to use
+        self.swept_physics = swept_physics
+
+        # Anything random in the game has to come from here, so replays match
+        self.seed = seed
+        self.random = random.Random(seed)
+
+        # Track the current state of what key is pressed
+        self.left_pressed = False
+        self.right_pressed = False
+        self.up_pressed = False
+        self.down_pressed = False
+        self.jump_needs_reset = False
+
+        self.coin_list = None
+        self.wall_list = None
+        self.background_list = None
+        self.ladder_list = None
+        self.player_list = None
+        self.player_animator = None
+        self.dont_touch_list = None
+        self.foreground_list = None
+        self.enemy_list = None
+        self.moving_platforms_list = None
+
+        # Grids to find the sprites near something
+        self.wall_grid = None
+        self.dont_touch_grid = None
+        self.enemy_grid = None
+        self.ladder_grid = None
+
+        # Moving platforms and enemies, moved together in arrays
+        self.platform_store = None
+        self.enemy_store = None
+        self.wall_cells = None
+
+        # Where enemies can walk and the way to the player. Which enemies chase,
+        # how fast they go and which ones stand on the ground (the others fly).
+        self.navigation = None
+        self.enemy_chase = None
+        self.enemy_speed = None
+        self.enemy_grounded = None
+
+        # Only the chunks of the level near the player are in the sprite lists
+        self.chunks = None
+
+        # (left, bottom, right, top) of what the view shows, set by the view, None without one
+        self.view_rect = None
+        self.coin_chunks = None
+
+        # Coins left to collect
+        self.coins = None
+
+        # Separate variable that holds the player sprite
+        self.player_sprite = None
+
+        # Our engine
+        self.physics_engine = None
+
+        self.end_of_map = 0
+
+        # Level
+        self.level = 1
+
+        # Our score
+        self.score = 0
+        self.game_score = 0
+
+        # Player Health
+        self.health = START_HEALTH
+
+        # time
+        self.total_time = START_TIME
+
+        # True once the last level is done
+        self.finished = False
+
+        # Things that happened since the view last looked
+        self.events = EventBus()
+
+    def setup(self, level=1):
+        """ Set up the level. Call this function to restart the game. """
+
+        self.score += self.game_score
+
+        # Create the Sprite lists
+        self.player_list = arcade.SpriteList()
+        self.background_list = arcade.SpriteList()
+
+        # One animator for every player, the view updates it
+        self.player_animator = player_animator()
+
+        # Set up the player
+        self.player_sprite = self.add_player_sprite()
+
+        # Map and tools, parsed once and kept in the level cache
+        level_data = self.level_cache.get(level)
+        self.end_of_map = level_data.end_of_map
+        self.view_rect = None
+        self.chunks = LevelChunks()
+        # PLATFORMS
+        self.wall_list = arcade.SpriteList()
+        wall_chunks = self.chunks.add(self.wall_list, copy_sprites(level_data.platforms))
+        self.wall_grid = TileGrid()
+        self.wall_grid.add_list(wall_chunks.sprites())
+
+        # Coins
+        self.coin_list = arcade.SpriteList()
+        self.coin_chunks = self.chunks.add(self.coin_list, copy_sprites(level_data.coins))
+        self.coins = CoinStore(self.coin_chunks)
+
+        # Moving platforms(if we have), they are always in the wall list
+        self.moving_platforms_list = copy_sprite_list(level_data.moving_platforms)
+        for sprite in self.moving_platforms_list:
+            self.wall_list.append(sprite)
+            self.wall_grid.add(sprite, moving=True)
+
+        # Background Objects
+        # self.background_list = arcade.tilemap.process_layer(level_data.map, "Background", TILE_SCALING)
+        self.ladder_list = arcade.SpriteList()
+        ladder_chunks = self.chunks.add(self.ladder_list, copy_sprites(level_data.ladders))
+
+        # Don't Touch
+        self.dont_touch_list = arcade.SpriteList()
+        dont_touch_chunks = self.chunks.add(self.dont_touch_list, copy_sprites(level_data.dont_touch))
+
+        # Enemies, the ones of the last level go back to the pool first
+        if self.enemy_list is not None:
+            enemy_pool.release(self.enemy_list)
+        self.enemy_list = enemy_pool.build(level_data.enemies)
+
+        # Grids for the other things we collide with
+        self.dont_touch_grid = TileGrid()
+        self.dont_touch_grid.add_list(dont_touch_chunks.sprites())
+        self.enemy_grid = TileGrid()
+        self.enemy_grid.add_list(self.enemy_list, moving=True)
+        self.ladder_grid = TileGrid()
+        self.ladder_grid.add_list(ladder_chunks.sprites())
+
+        # Moving things, updated together in arrays
+        self.platform_store = EntityStore(self.moving_platforms_list, zero_is_off=True)
+        self.enemy_store = EntityStore(self.enemy_list)
+        self.wall_cells = CellMap(self.wall_grid)
+
+        # Enemies only walk on the level's walls and ladders, moving platforms don't count
+        self.navigation = NavGrid(wall_chunks.sprites(), ladder_chunks.sprites())
+        self.enemy_chase = np.array([enemy.chase for enemy in self.enemy_list], dtype=bool)
+        self.enemy_speed = np.abs(self.enemy_store.change_x)
+        self.enemy_grounded = self.navigation.is_walkable(self.enemy_store.x, self.enemy_store.y)
+
+        self.update_chunks()
+
+        # Physics Engine
+        self.physics_engine = self.make_physics_engine(self.player_sprite)
+
+        # Get the next level ready while this one is played
+        if level < LAST_LEVEL:
+            self.level_cache.preload(level + 1)
+
+    def add_player_sprite(self):
+        """ A new player at the start of the level, in the player list """
+        player_sprite = PlayerCharacter()
+        player_sprite.center_x = PLAYER_START_X
+        player_sprite.center_y = PLAYER_START_Y
+        self.player_list.append(player_sprite)
+        self.player_animator.add(player_sprite)
+        return player_sprite
+
+    def remove_player_sprite(self, player_sprite):
+        """ Take a player out of the level """
+        player_sprite.remove_from_sprite_lists()
+        self.player_animator.remove(player_sprite)
+
+    def make_physics_engine(self, player_sprite):
+        """ Physics engine for one player in the current level """
+        if self.swept_physics:
+            return SweptPhysicsEngine(player_sprite, self.wall_grid, self.ladder_grid, gravity_constant=GRAVITY)
+        return arcade.PhysicsEnginePlatformer(player_sprite, self.wall_list,
+                                              gravity_constant=GRAVITY, ladders=self.ladder_list)
+
+    def process_keychange(self):
+        # Called when we change a key up/down or we move on/off a ladder.
+
+        # process up/down
+        if self.up_pressed and not self.down_pressed:
+            if self.physics_engine.is_on_ladder():
+                self.player_sprite.change_y = PLAYER_MOVEMENT_SPEED
+            elif self.physics_engine.can_jump() and not self.jump_needs_reset:
+                self.player_sprite.change_y = PLAYER_JUMP_SPEED
+                self.jump_needs_reset = True
+                self.events.emit(PlayerJumped())
+        elif self.down_pressed and not self.up_pressed:
+            if self.physics_engine.is_on_ladder():
+                self.player_sprite.change_y = -PLAYER_MOVEMENT_SPEED
+
+        # Process up/down when no movement
+        if self.physics_engine.is_on_ladder():
+            if not self.up_pressed and not self.down_pressed:
+                self.player_sprite.change_y = 0
+            elif self.up_pressed and self.down_pressed:
+                self.player_sprite.change_y = 0
+
+        # process left/right
+        if self.right_pressed and not self.left_pressed:
+            self.player_sprite.change_x = PLAYER_MOVEMENT_SPEED
+        elif self.left_pressed and not self.right_pressed:
+            self.player_sprite.change_x = -PLAYER_MOVEMENT_SPEED
+        else:
+            self.player_sprite.change_x = 0
+
+    def set_keys(self, keys):
+        """ Take the keys held down this tick, as KEY_* bits """
+        if self.up_pressed and not keys & KEY_UP:
+            self.jump_needs_reset = False
+        self.left_pressed = bool(keys & KEY_LEFT)
+        self.right_pressed = bool(keys & KEY_RIGHT)
+        self.up_pressed = bool(keys & KEY_UP)
+        self.down_pressed = bool(keys & KEY_DOWN)
+        self.process_keychange()
+
+    def checksum(self):
+        """ Number that changes when the player position, score, health or level does """
+        data = struct.pack("<4d3i", self.player_sprite.center_x, self.player_sprite.center_y,
+                           self.player_sprite.change_x, self.player_sprite.change_y,
+                           self.game_score, self.health, self.level)
+        return zlib.crc32(data)
+
+    def player_sprites(self):
+        """ Every player in the level """
+        return [self.player_sprite]
+
+    def update_chunks(self):
+        """ Keep the chunks the camera shows, and the ones around the player, in the sprite lists """
+        x = self.player_sprite.center_x
+        if self.view_rect is None:
+            # No view, the camera would never be more than a screen away from the player
+            self.chunks.update(x - SCREEN_WIDTH, x + SCREEN_WIDTH)
+        else:
+            # What is on screen, and the walls next to the player for the physics
+            left, bottom, right, top = self.view_rect
+            self.chunks.update(min(left, x - CHUNK_WIDTH), max(right, x + CHUNK_WIDTH))
+
+    def reset_player(self, cause):
+        """ Send the player back to the start of the level and take one health. """
+        self.player_sprite.center_x = PLAYER_START_X
+        self.player_sprite.center_y = PLAYER_START_Y
+        self.health -= 1
+        self.events.emit(PlayerHit(cause, self.health))
+
+    def step(self, keys=None, delta_time=UPDATE_RATE):
+        """ Move the game forward by one fixed tick. keys are KEY_* bits, None keeps the last ones. """
+
+        if self.finished:
+            return
+
+        with profiler.scope("tick"):
+            self._step(keys, delta_time)
+
+    def _step(self, keys, delta_time):
+
+        if keys is not None:
+            self.set_keys(keys)
+
+        # The parts that move the world and the parts for the player are
+        # separate, so more than one player can take turns in between.
+        self._move_enemies()
+        self._move_player(delta_time)
+        self._move_walls()
+        self._collect_coins()
+        self._turn_enemies()
+        self._check_player()
+
+    def _move_enemies(self):
+        # We're calling physics engine
+        # Enemy
+        with profiler.scope("enemies"):
+            if not self.health == 0:
+                self._steer_enemies()
+                self.enemy_store.move()
+                store = self.enemy_store
+                store.push()
+                boxes = zip(store.left.tolist(), store.bottom.tolist(), store.right.tolist(), store.top.tolist())
+                for enemy, box in zip(store.sprites, boxes):
+                    self.enemy_grid.update(enemy, box)
+
+    def _steer_enemies(self):
+        """ Point chasing enemies along the flow field. Only left and right, enemies don't climb. """
+        if not self.enemy_chase.any():
+            return
+        with profiler.scope("enemy paths"):
+            self.navigation.update(self.player_sprites())
+            store = self.enemy_store
+            step_x, step_y, reached = self.navigation.directions(store.x, store.y)
+            chasing = self.enemy_chase & reached
+            walk = chasing & (step_x != 0)
+            store.change_x[walk] = step_x[walk] * self.enemy_speed[walk]
+
+            # The way goes up or down a ladder, wait at the bottom or top of it
+            wait = chasing & (step_y != 0)
+            store.change_x[wait] = 0
+
+            # Lost the way, walk back into the boundaries, then between them
+            lost = self.enemy_chase & ~chasing
+            back = np.where(store.left < store.boundary_left, 1, np.where(store.right > store.boundary_right, -1, 0))
+            outside = lost & (back != 0)
+            store.change_x[outside] = back[outside] * self.enemy_speed[outside]
+            stopped = self.enemy_chase & ~wait & (store.change_x == 0)
+            store.change_x[stopped] = self.enemy_speed[stopped]
+
+    def _move_player(self, delta_time):
+        with profiler.scope("physics"):
+            self.physics_engine.update()
+
+        self.total_time -= delta_time
+
+        # Update animations
+        if self.physics_engine.can_jump():
+            self.player_sprite.can_jump = False
+        else:
+            self.player_sprite.can_jump = True
+
+        if self.physics_engine.is_on_ladder() and not self.physics_engine.can_jump():
+            self.player_sprite.is_on_ladder = True
+            self.process_keychange()
+        else:
+            self.player_sprite.is_on_ladder = False
+            self.process_keychange()
+
+    def _move_walls(self):
+        # Move the moving walls, and see if they hit a boundary and need to reverse direction.
+        # arcade's engine moves them itself, and carries and pushes the player with them.
+        with profiler.scope("moving walls"):
+            store = self.platform_store
+            if self.swept_physics:
+                start_x = store.x.copy()
+                start_y = store.y.copy()
+                riding = [(player, self._platform_under(player)) for player in self.player_sprites()]
+                store.move()
+                store.bounce()
+                store.push()
+                self._move_players_with_platforms(riding, store.x - start_x, store.y - start_y)
+            else:
+                store.pull()
+            for wall in self.moving_platforms_list:
+                self.wall_grid.update(wall)
+
+        # Walls and coins of the part of the level we are in
+        with profiler.scope("chunks"):
+            self.update_chunks()
+
+    def _platform_under(self, player):
+        """ Index of the moving wall the player stands on, or None """
+        store = self.platform_store
+        under = np.flatnonzero((np.abs(store.top - player.bottom) <= PLATFORM_CONTACT)
+                               & (store.left < player.right) & (store.right > player.left))
+        return int(under[0]) if len(under) else None
+
+    def _move_players_with_platforms(self, riding, moved_x, moved_y):
+        """ Players go along with the moving wall they stand on, and out of the way of one that moved into them """
+        store = self.platform_store
+        for player, index in riding:
+            if index is not None:
+                player.center_x += moved_x[index]
+                player.center_y += moved_y[index]
+
+            hits = np.flatnonzero((store.left < player.right - PLATFORM_CONTACT)
+                                  & (store.right > player.left + PLATFORM_CONTACT)
+                                  & (store.bottom < player.top - PLATFORM_CONTACT)
+                                  & (store.top > player.bottom + PLATFORM_CONTACT))
+            for i in hits.tolist():
+                if moved_x[i] > 0:
+                    player.left = store.right[i]
+                elif moved_x[i] < 0:
+                    player.right = store.left[i]
+                elif moved_y[i] > 0:
+                    player.bottom = store.top[i]
+                elif moved_y[i] < 0:
+                    player.top = store.bottom[i]
+
+    def _collect_coins(self):
+        # if you hit any coins
+        with profiler.scope("coins"):
+            # The coins leave the sprite list later, in compact()
+            for _ in self.coins.collect_hits(self.player_sprite):
+                self.game_score += 1
+                self.events.emit(CoinCollected(self.game_score))
+
+    def _turn_enemies(self):
+        # enemy, a wall in front of it turns it around. Only the ones with a wall cell or a moving wall right
+        # in front get the exact check. The floor they walk on isn't in front of them.
+        with profiler.scope("enemy walls"):
+            store = self.enemy_store
+            ahead = store.ahead(ENEMY_FLOOR_CONTACT)
+            hit_wall = self.wall_cells.touches(*ahead) | self.platform_store.hits(*ahead)
+            lefts, bottoms, rights, tops = ahead
+            for index in hit_wall.nonzero()[0].tolist():
+                left, bottom, right, top = lefts[index], bottoms[index], rights[index], tops[index]
+                hit_wall[index] = any(wall.left <= right and wall.right >= left
+                                      and wall.bottom <= top and wall.top >= bottom
+                                      for wall in self.wall_grid.in_box(left, bottom, right, top))
+
+            # Enemies on the ground don't walk off the edge of a platform
+            front = np.where(store.change_x > 0, store.right, store.left)
+            at_edge = self.enemy_grounded & (store.change_x != 0) & ~self.navigation.is_walkable(front, store.y)
+            self.enemy_store.patrol(hit_wall | at_edge)
+            self.enemy_store.push()
+
+    def _check_player(self):
+        if self.player_sprite.center_x >= self.end_of_map:
+            self.level += 1
+            # end of the game
+            if self.level > LAST_LEVEL:
+                self.finished = True
+                self.events.emit(GameFinished())
+                return
+            with profiler.scope("level setup"):
+                self.setup(self.level)
+            self.events.emit(LevelCompleted(self.level))
+
+        with profiler.scope("enemy hits"):
+            if len(self.enemy_grid.check_for_collision(self.player_sprite)) > 0:
+                self.reset_player("enemy")
+
+        # if player falls
+        if self.player_sprite.center_y < -100:
+            self.reset_player("fall")
+
+        if self.health == 0:
+            self.total_time = 303.0
+            self.health = START_HEALTH
+            self.game_score = self.game_score - 20
+            self.events.emit(PlayerDied(self.game_score))
+
+        # if character hits don't touch
+        with profiler.scope("don't touch"):
+            dont_touch_hit = self.dont_touch_grid.check_for_collision(self.player_sprite)
+            if not dont_touch_hit and self.swept_physics:
+                # Also the ones we went through during the tick
+                dont_touch_hit = self.physics_engine.swept_hits(self.dont_touch_grid)
+            if dont_touch_hit:
+                self.player_sprite.change_x = 0
+                self.player_sprite.change_y = 0
+                self.reset_player("dont_touch")
+
+    def run(self, ticks, keys=0):
+        """ Run a number of ticks as fast as we can. Events are thrown away. """
+        for _ in range(ticks):
+            self.step(keys)
+            self.events.clear()
+            if self.finished:
+                break
+
+
+def main():
+    """ Run the game headless for a while and print the speed """
+    parser = argparse.ArgumentParser(description="Run the game without a window")
+    parser.add_argument("--ticks", type=int, default=10000, help="how many ticks to run")
+    parser.add_argument("--swept", action="store_true", help="use the swept physics engine")
+    parser.add_argument("--profile", help="write the time of each part of a tick to this .json or .csv file")
+    args = parser.parse_args()
+
+    simulation = GameSimulation(swept_physics=args.swept)
+    simulation.setup()
+    start = time.perf_counter()
+    simulation.run(args.ticks, KEY_RIGHT)
+    seconds = time.perf_counter() - start
+    print(f"{args.ticks} ticks in {seconds:.2f}s ({args.ticks / seconds:.0f} ticks/s)")
+    print(f"Assets: {assets.stats()}")
+
+    if args.profile:
+        profiler.write(args.profile)
+    else:
+        print("\n".join(profiler.lines()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import struct
+
+# Where F5 writes the quick save
+QUICK_SAVE_FILE = "quick_save.snap"
+
+MAGIC = b"2DSS"
+# 3: no random generator state
+VERSION = 3
+
+# magic, version, level
+HEADER = struct.Struct("<4sBB")
+# score, game score, health, total time, flags
+GAME = struct.Struct("<iiidB")
+# x, y, change_x, change_y, face direction, animation state, seconds in that state, flags
+PLAYER = struct.Struct("<4dBBdB")
+# number of coins, enemies and moving platforms
+COUNTS = struct.Struct("<III")
+
+# Size of everything before the coins. The simulation's random generator isn't saved, nothing uses it yet.
+FIXED_SIZE = HEADER.size + GAME.size + PLAYER.size + COUNTS.size
+
+# Bits of the game flags byte
+GAME_FINISHED = 1
+JUMP_NEEDS_RESET = 2
+LEFT_PRESSED = 4
+RIGHT_PRESSED = 8
+UP_PRESSED = 16
+DOWN_PRESSED = 32
+
+# Bits of the player flags byte
+PLAYER_JUMPING = 1
+PLAYER_CLIMBING = 2
+PLAYER_ON_LADDER = 4
+PLAYER_CAN_JUMP = 8
+
+
+def _flags(*values):
+    result = 0
+    for bit, value in values:
+        if value:
+            result |= bit
+    return result
+
+
+def to_bytes(simulation):
+    """ Everything that changes while a level is played, in about a hundred bytes plus the coins and enemies """
+    sim = simulation
+    player = sim.player_sprite
+
+    game_flags = _flags((GAME_FINISHED, sim.finished), (JUMP_NEEDS_RESET, sim.jump_needs_reset),
+                        (LEFT_PRESSED, sim.left_pressed), (RIGHT_PRESSED, sim.right_pressed),
+                        (UP_PRESSED, sim.up_pressed), (DOWN_PRESSED, sim.down_pressed))
+    player_flags = _flags((PLAYER_JUMPING, player.jumping), (PLAYER_CLIMBING, player.climbing),
+                          (PLAYER_ON_LADDER, player.is_on_ladder),
+                          (PLAYER_CAN_JUMP, getattr(player, "can_jump", False)))
+
+    # What the animator picks the player's frame from
+    animator = sim.player_animator
+    row = animator.index(player)
+
+    return b"".join((
+        HEADER.pack(MAGIC, VERSION, sim.level),
+        GAME.pack(sim.score, sim.game_score, sim.health, sim.total_time, game_flags),
+        PLAYER.pack(player.center_x, player.center_y, player.change_x, player.change_y,
+                    player.character_face_direction, animator.state[row], animator.elapsed[row], player_flags),
+        COUNTS.pack(len(sim.coins), len(sim.enemy_store), len(sim.platform_store)),
+        bytes(sim.coins.bits),
+        sim.enemy_store.to_bytes(),
+        sim.platform_store.to_bytes(),
+    ))
+
+
+def restore(simulation, data):
+    """
+    Put a simulation back in the state of to_bytes(). The level is only set
+    up again if the snapshot is of another level, and that comes from the
+    level cache, so the map isn't read again.
+
+    Raises ValueError, with the simulation unchanged, for data that isn't a
+    snapshot of this version or doesn't match the level's coins, enemies
+    and moving platforms.
+    """
+    sim = simulation
+    if len(data) < FIXED_SIZE:
+        raise ValueError("Not a snapshot")
+    magic, version, level = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a snapshot, or one from another version")
+    offset = HEADER.size
+    score, game_score, health, total_time, game_flags = GAME.unpack_from(data, offset)
+    offset += GAME.size
+    (x, y, change_x, change_y, face, animation_state, elapsed,
+     player_flags) = PLAYER.unpack_from(data, offset)
+    offset += PLAYER.size
+    counts = COUNTS.unpack_from(data, offset)
+    offset += COUNTS.size
+
+    # Check everything against the level before changing anything
+    level_data = sim.level_cache.get(level)
+    coin_count, enemy_count, platform_count = counts
+    if counts != (len(level_data.coins), len(level_data.enemies), len(level_data.moving_platforms)):
+        raise ValueError("Snapshot doesn't match the level")
+    coin_bytes = (coin_count + 7) // 8
+    enemy_bytes = enemy_count * 4 * 8
+    platform_bytes = platform_count * 4 * 8
+    if len(data) != offset + coin_bytes + enemy_bytes + platform_bytes:
+        raise ValueError("Snapshot doesn't match the level")
+
+    if level != sim.level or sim.player_sprite is None:
+        sim.level = level
+        sim.setup(level)
+
+    sim.score, sim.game_score, sim.health, sim.total_time = score, game_score, health, total_time
+    sim.finished = bool(game_flags & GAME_FINISHED)
+    sim.jump_needs_reset = bool(game_flags & JUMP_NEEDS_RESET)
+    sim.left_pressed = bool(game_flags & LEFT_PRESSED)
+    sim.right_pressed = bool(game_flags & RIGHT_PRESSED)
+    sim.up_pressed = bool(game_flags & UP_PRESSED)
+    sim.down_pressed = bool(game_flags & DOWN_PRESSED)
+
+    player = sim.player_sprite
+    player.center_x = x
+    player.center_y = y
+    player.change_x = change_x
+    player.change_y = change_y
+    player.character_face_direction = face
+    player.jumping = bool(player_flags & PLAYER_JUMPING)
+    player.climbing = bool(player_flags & PLAYER_CLIMBING)
+    player.is_on_ladder = bool(player_flags & PLAYER_ON_LADDER)
+    player.can_jump = bool(player_flags & PLAYER_CAN_JUMP)
+    sim.player_animator.restore(player, animation_state, face, elapsed)
+
+    sim.coins.set_bits(data[offset:offset + coin_bytes])
+    offset += coin_bytes
+
+    sim.enemy_store.load_bytes(data[offset:offset + enemy_bytes])
+    offset += enemy_bytes
+    for enemy in sim.enemy_list:
+        sim.enemy_grid.update(enemy)
+
+    sim.platform_store.load_bytes(data[offset:offset + platform_bytes])
+    for wall in sim.moving_platforms_list:
+        sim.wall_grid.update(wall)
+
+    sim.update_chunks()
+    sim.events.clear()
+
+
+def save(simulation, path=QUICK_SAVE_FILE):
+    with open(path, "wb") as file:
+        file.write(to_bytes(simulation))
+
+
+def load(simulation, path=QUICK_SAVE_FILE):
+    with open(path, "rb") as file:
+        restore(simulation, file.read())
@@ -0,0 +1,111 @@
+import math
+
+import arcade
+
+from constants import GRID_PIXEL_SIZE
+
+
+class TileGrid:
+    """
+    Uniform grid of tile sized cells, used to find sprites near another sprite.
+
+    Static sprites are put in their cells once. Moving sprites remember the
+    cells they are in and only get moved when they cross into new cells.
+    """
+
+    def __init__(self, cell_size=GRID_PIXEL_SIZE):
+        self.cell_size = cell_size
+
+        # (column, row) -> list of sprites touching that cell
+        self.cells = {}
+
+        # id(sprite) -> cell range the sprite is bucketed in, only for moving sprites
+        self.moving = {}
+
+    def cell_range(self, left, bottom, right, top):
+        """ Columns and rows covered by a box, as (col_min, col_max, row_min, row_max) """
+        size = self.cell_size
+        return (math.floor(left / size), math.floor(right / size),
+                math.floor(bottom / size), math.floor(top / size))
+
+    def sprite_range(self, sprite):
+        return self.cell_range(sprite.left, sprite.bottom, sprite.right, sprite.top)
+
+    def _insert(self, sprite, cell_range):
+        col_min, col_max, row_min, row_max = cell_range
+        for col in range(col_min, col_max + 1):
+            for row in range(row_min, row_max + 1):
+                self.cells.setdefault((col, row), []).append(sprite)
+
+    def _remove(self, sprite, cell_range):
+        col_min, col_max, row_min, row_max = cell_range
+        for col in range(col_min, col_max + 1):
+            for row in range(row_min, row_max + 1):
+                bucket = self.cells.get((col, row))
+                if bucket is None:
+                    continue
+                for i, other in enumerate(bucket):
+                    if other is sprite:
+                        del bucket[i]
+                        break
+                if not bucket:
+                    del self.cells[(col, row)]
+
+    def add(self, sprite, moving=False):
+        cell_range = self.sprite_range(sprite)
+        self._insert(sprite, cell_range)
+        if moving:
+            self.moving[id(sprite)] = cell_range
+
+    def add_list(self, sprite_list, moving=False):
+        for sprite in sprite_list:
+            self.add(sprite, moving)
+
+    def remove(self, sprite):
+        cell_range = self.moving.pop(id(sprite), None)
+        if cell_range is None:
+            cell_range = self.sprite_range(sprite)
+        self._remove(sprite, cell_range)
+
+    def update(self, sprite, box=None):
+        """
+        Call after a moving sprite moved. Only touches the grid if it changed
+        cells. box is its (left, bottom, right, top) if the caller knows it,
+        which saves working it out from the hit box.
+        """
+        old_range = self.moving[id(sprite)]
+        new_range = self.sprite_range(sprite) if box is None else self.cell_range(*box)
+        if new_range != old_range:
+            self._remove(sprite, old_range)
+            self._insert(sprite, new_range)
+            self.moving[id(sprite)] = new_range
+
+    def nearby(self, sprite):
+        """ Sprites in the cells around a sprite. No duplicates, may include far misses. """
+        col_min, col_max, row_min, row_max = self.sprite_range(sprite)
+        found = []
+        seen = set()
+        for col in range(col_min - 1, col_max + 2):
+            for row in range(row_min - 1, row_max + 2):
+                for other in self.cells.get((col, row), ()):
+                    if id(other) not in seen and other is not sprite:
+                        seen.add(id(other))
+                        found.append(other)
+        return found
+
+    def in_box(self, left, bottom, right, top):
+        """ Sprites in the cells a box touches. No duplicates, may include far misses. """
+        col_min, col_max, row_min, row_max = self.cell_range(left, bottom, right, top)
+        found = []
+        seen = set()
+        for col in range(col_min, col_max + 1):
+            for row in range(row_min, row_max + 1):
+                for other in self.cells.get((col, row), ()):
+                    if id(other) not in seen:
+                        seen.add(id(other))
+                        found.append(other)
+        return found
+
+    def check_for_collision(self, sprite):
+        """ Same result as arcade.check_for_collision_with_list, but only looks at nearby cells """
+        return [other for other in self.nearby(sprite) if arcade.check_for_collision(sprite, other)]
@@ -0,0 +1,95 @@
+import os
+import sys
+
+import pytest
+
+# The game modules are in the folder above this one
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The tests run without a display. Without arcade, and so pyglet, the tests that need it are skipped.
+try:
+    import headless  # noqa: F401
+except ImportError:
+    pass
+
+ENEMY_KINDS = ("wormGreen", "slimeGreen", "bee")
+
+
+def make_level(width, enemy_count):
+    """
+    A level width tiles wide: ground all the way, two rows of coins, a
+    moving platform and a ladder every 10 tiles, spikes up high and
+    enemy_count enemies on the ground. Enemy i starts at column
+    10 + i * (width - 12) // enemy_count, walks 2 tiles left and 3 right of
+    it, and every other one, starting with the first, chases the players.
+    """
+    import arcade
+
+    from assets import assets
+    from constants import GRID_PIXEL_SIZE, TILE_SCALING
+    from enemies import EnemySpawn
+    from levels import LevelData
+
+    def tile(filename, col, row):
+        sprite = arcade.Sprite(scale=TILE_SCALING)
+        sprite.texture = assets.texture(filename)
+        sprite.center_x = (col + 0.5) * GRID_PIXEL_SIZE
+        sprite.center_y = (row + 0.5) * GRID_PIXEL_SIZE
+        return sprite
+
+    platforms = arcade.SpriteList()
+    coins = arcade.SpriteList()
+    moving_platforms = arcade.SpriteList()
+    ladders = arcade.SpriteList()
+    dont_touch = arcade.SpriteList()
+
+    for col in range(width):
+        platforms.append(tile(":resources:images/tiles/grassMid.png", col, 0))
+        coins.append(tile(":resources:images/items/coinGold.png", col, 2))
+        coins.append(tile(":resources:images/items/coinGold.png", col, 5))
+
+        if col % 10 == 5:
+            platform_sprite = tile(":resources:images/tiles/grassMid.png", col, 7)
+            platform_sprite.boundary_left = (col - 3) * GRID_PIXEL_SIZE
+            platform_sprite.boundary_right = (col + 4) * GRID_PIXEL_SIZE
+            platform_sprite.change_x = 2
+            moving_platforms.append(platform_sprite)
+
+            ladders.append(tile(":resources:images/tiles/ladderMid.png", col, 1))
+            dont_touch.append(tile(":resources:images/tiles/spikes.png", col, 14))
+
+    enemies = []
+    for i in range(enemy_count):
+        col = 10 + (i * (width - 12)) // enemy_count
+        left = col * GRID_PIXEL_SIZE
+        enemies.append(EnemySpawn(ENEMY_KINDS[i % len(ENEMY_KINDS)], left, GRID_PIXEL_SIZE,
+                                  left - 2 * GRID_PIXEL_SIZE, left + 3 * GRID_PIXEL_SIZE, 3, i % 2 == 0))
+
+    return LevelData(1, width * GRID_PIXEL_SIZE, platforms, coins, moving_platforms, ladders, dont_touch,
+                     enemies)
+
+
+@pytest.fixture
+def make_simulation():
+    """
+    Makes simulations of a make_level() level, already set up:
+    make_simulation(width=100, enemy_count=0, swept_physics=True).
+    The level is built once for each width and enemy count, simulations of
+    the same one share a LevelCache, which is their level_cache.
+    """
+    pytest.importorskip("arcade")
+    from levels import LevelCache
+    from simulation import GameSimulation
+
+    caches = {}
+
+    def make(width=100, enemy_count=0, swept_physics=True):
+        cache = caches.get((width, enemy_count))
+        if cache is None:
+            level_data = make_level(width, enemy_count)
+            cache = caches[width, enemy_count] = LevelCache(loader=lambda level: level_data)
+        simulation = GameSimulation(cache=cache, swept_physics=swept_physics)
+        simulation.setup(1)
+        return simulation
+
+    return make
@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from animation import Animation, Animator
+from constants import RIGHT_FACING, LEFT_FACING
+
+
+def walk_animation():
+    return Animation(["walk0", "walk1", "walk2"], [0.1, 0.1, 0.2], ["left0", "left1", "left2"])
+
+
+def test_frames_follow_time():
+    sprite = SimpleNamespace(texture=None)
+    animator = Animator([sprite], [walk_animation()])
+    animator.update(0.05)
+    assert sprite.texture == "walk0"
+    animator.update(0.1)
+    assert sprite.texture == "walk1"
+    animator.update(0.1)
+    assert sprite.texture == "walk2"
+
+    # Past the end it starts again
+    animator.update(0.2)
+    assert sprite.texture == "walk0"
+
+
+def test_same_time_whatever_the_frame_rate():
+    slow = SimpleNamespace(texture=None)
+    fast = SimpleNamespace(texture=None)
+    slow_animator = Animator([slow], [walk_animation()])
+    fast_animator = Animator([fast], [walk_animation()])
+    for _ in range(5):
+        slow_animator.update(1 / 30)
+    for _ in range(10):
+        fast_animator.update(1 / 60)
+    assert slow.texture == fast.texture
+
+
+def test_states_faces_and_moving_only():
+    sprites = [SimpleNamespace(texture=None, state=0, face=RIGHT_FACING, moving=True) for _ in range(2)]
+
+    def choose_states(sprites, faces):
+        return (np.array([sprite.state for sprite in sprites]), np.array([sprite.face for sprite in sprites]),
+                np.array([sprite.moving for sprite in sprites]))
+
+    climb = Animation(["climb0", "climb1"], [0.1, 0.1], moving_only=True)
+    animator = Animator(sprites, [walk_animation(), climb], choose_states=choose_states)
+    sprites[1].face = LEFT_FACING
+    animator.update(0.15)
+    assert [sprite.texture for sprite in sprites] == ["walk1", "left1"]
+
+    # A new state starts at its first frame, and a moving_only one holds still while not moving
+    sprites[0].state = 1
+    sprites[0].moving = False
+    animator.update(0.15)
+    assert sprites[0].texture == "climb0"
+    animator.update(0.15)
+    assert sprites[0].texture == "climb0"
+
+
+def test_add_remove_and_restore():
+    first = SimpleNamespace(texture=None)
+    second = SimpleNamespace(texture=None)
+    animator = Animator([], [walk_animation()])
+    animator.add(first)
+    animator.add(second)
+    animator.update(0.15)
+    animator.remove(first)
+    assert animator.sprites == [second]
+    assert len(animator.elapsed) == 1
+
+    animator.restore(second, 0, LEFT_FACING, 0.25)
+    assert second.texture == "left2"
+    assert animator.index(second) == 0
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+pytest.importorskip("arcade")
+
+from atlas import PADDING, pack, source_hash
+
+
+def test_pack_places_boxes_without_overlap():
+    sizes = [(30, 40), (50, 20), (100, 100), (10, 10), (60, 45), (80, 30)]
+    places, (width, height) = pack(sizes, width=128)
+
+    boxes = [(x, y, x + w, y + h) for (x, y), (w, h) in zip(places, sizes)]
+    for box in boxes:
+        assert box[0] >= PADDING and box[1] >= PADDING
+        assert box[2] + PADDING <= width and box[3] + PADDING <= height
+    for i, a in enumerate(boxes):
+        for b in boxes[i + 1:]:
+            assert a[2] <= b[0] or b[2] <= a[0] or a[3] <= b[1] or b[3] <= a[1]
+
+
+def test_pack_grows_for_a_wide_box():
+    places, (width, height) = pack([(300, 10)], width=128)
+    assert places == [(PADDING, PADDING)]
+    assert width == 300 + 2 * PADDING
+
+
+def test_source_hash_follows_changes(tmp_path):
+    image = tmp_path / "frame.png"
+    image.write_bytes(b"one")
+    first = source_hash([str(image)])
+    assert source_hash([str(image)]) == first
+
+    # A newer file makes another atlas
+    stat = os.stat(image)
+    os.utime(image, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert source_hash([str(image)]) != first
@@ -0,0 +1,83 @@
+import pytest
+
+arcade = pytest.importorskip("arcade")
+
+from audio import AudioService
+
+
+class FakePlayer:
+    def __init__(self):
+        self.playing = True
+        self.deleted = False
+
+    def pause(self):
+        self.playing = False
+
+    def delete(self):
+        self.deleted = True
+
+
+@pytest.fixture
+def players(monkeypatch):
+    started = []
+
+    def play_sound(sound):
+        if sound == "broken":
+            raise RuntimeError("can't play")
+        started.append(FakePlayer())
+        return started[-1]
+
+    monkeypatch.setattr(arcade, "play_sound", play_sound)
+    return started
+
+
+def test_one_voice_per_frame(players):
+    audio = AudioService(max_voices=4)
+    for _ in range(10):
+        audio.play("coin")
+    audio.flush()
+    assert len(players) == 1
+
+
+def test_voice_limit(players):
+    audio = AudioService(max_voices=2)
+    for _ in range(5):
+        audio.play("coin")
+        audio.flush()
+    assert len(players) == 2
+
+
+def test_finished_voices_are_deleted(players):
+    audio = AudioService()
+    audio.set_limit("music", 1)
+    audio.play("music")
+    audio.flush()
+    players[0].playing = False
+
+    audio.play("music")
+    audio.flush()
+    assert players[0].deleted
+    assert len(players) == 2
+
+
+def test_stop(players):
+    audio = AudioService()
+    audio.play("music")
+    audio.flush()
+    audio.play("music")
+    audio.stop("music")
+    audio.flush()
+    assert len(players) == 1
+    assert players[0].deleted and not players[0].playing
+
+
+def test_error_does_not_stop_other_sounds(players):
+    audio = AudioService()
+    audio.play("broken")
+    audio.play("coin")
+    audio.flush()
+    assert len(players) == 1
+
+    audio.play("jump")
+    audio.flush()
+    assert len(players) == 2
@@ -0,0 +1,51 @@
+import numpy
+import pytest
+
+pytest.importorskip("arcade")
+
+import bake
+
+
+def test_missing_file(tmp_path):
+    assert bake.read(str(tmp_path / "missing.lvl"), 1) is None
+
+
+def test_cut_short_file(tmp_path):
+    path = tmp_path / "short.lvl"
+    path.write_bytes(bake.MAGIC + bytes([bake.VERSION, 1]))
+    assert bake.read(str(path), 1) is None
+
+
+def test_broken_offsets(tmp_path):
+    # A whole header that points past the end of the file
+    header = bake.HEADER.pack(bake.MAGIC, bake.VERSION, 1, 100.0, 0, 0, 1, 1, 0, 0, 0, *([1 << 20] * 7))
+    path = tmp_path / "broken.lvl"
+    path.write_bytes(header)
+    assert bake.read(str(path), 1) is None
+
+
+def test_other_version(tmp_path):
+    header = bake.HEADER.pack(bake.MAGIC, bake.VERSION + 1, 1, 100.0, 0, 0, 0, 0, 0, 0, 0, *([0] * 7))
+    path = tmp_path / "old.lvl"
+    path.write_bytes(header)
+    assert bake.read(str(path), 1) is None
+
+
+@pytest.mark.parametrize("section, field, value", [(1, "texture", 1000), (1, "layer", 7), (1, "frame_count", 5),
+                                                   (3, "kind", 1 << 20), (0, "points", 1 << 20)])
+def test_broken_index(make_simulation, tmp_path, section, field, value):
+    level_data = make_simulation(20, 1).level_cache.get(1)
+    data = bytearray(bake.to_bytes(level_data, (0, 0)))
+    path = tmp_path / "level.lvl"
+    path.write_bytes(data)
+    assert bake.read(str(path), 1) is not None
+
+    # Point the first row of a section past the end of what the file has
+    header = bake.HEADER.unpack_from(data)
+    counts, offsets = header[6:11], header[11:]
+    dtype = (bake.TEXTURE, bake.SPRITE, bake.FRAME, bake.SPAWN)[section]
+    rows = numpy.frombuffer(data, dtype, counts[section], offsets[section]).copy()
+    rows[field][0] = value
+    data[offsets[section]:offsets[section] + rows.nbytes] = rows.tobytes()
+    path.write_bytes(data)
+    assert bake.read(str(path), 1) is None
@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import pytest
+
+arcade = pytest.importorskip("arcade")
+
+from camera import Camera
+
+
+def box(left, bottom, width=40, height=60):
+    return SimpleNamespace(left=left, bottom=bottom, right=left + width, top=bottom + height)
+
+
+@pytest.fixture
+def viewports(monkeypatch):
+    calls = []
+    monkeypatch.setattr(arcade, "set_viewport", lambda *viewport: calls.append(viewport), raising=False)
+    return calls
+
+
+def test_deadzone(viewports):
+    camera = Camera(800, 600, smoothing=0, margins=(250, 250, 100, 50))
+    camera.update(box(300, 200), 1 / 60)
+    assert (camera.left, camera.bottom) == (0, 0)
+
+    # Past the right margin the camera follows
+    camera.update(box(600, 200), 1 / 60)
+    assert camera.left == 600 + 40 - 800 + 250
+
+
+def test_clamped_to_level(viewports):
+    camera = Camera(800, 600, smoothing=0, margins=(250, 250, 100, 50))
+    camera.update(box(-100, 200), 1 / 60)
+    assert camera.left == 0
+
+    camera.update(box(5000, 200), 1 / 60, level_right=2000)
+    assert camera.left == 2000 - 800
+
+
+def test_smoothing_moves_part_of_the_way(viewports):
+    camera = Camera(800, 600, smoothing=0.1, margins=(250, 250, 100, 50))
+    camera.update(box(300, 200), 1 / 60)
+    camera.update(box(1000, 200), 1 / 60)
+    target = 1000 + 40 - 800 + 250
+    assert 0 < camera.left < target
+
+
+def test_viewport_only_set_on_whole_pixel_changes(viewports):
+    camera = Camera(800, 600, smoothing=0, margins=(250, 250, 100, 50))
+    camera.update(box(300, 200), 1 / 60)
+    camera.update(box(300.2, 200), 1 / 60)
+    assert viewports == [(0, 800, 0, 600)]
+
+
+def test_visible_rect(viewports):
+    camera = Camera(800, 600, smoothing=0, margins=(250, 250, 100, 50))
+    camera.update(box(1000, 200), 1 / 60)
+    left = round(camera.left)
+    assert camera.visible_rect() == (left, 0, left + 800, 600)
+    assert camera.visible_rect(10) == (left - 10, -10, left + 810, 610)
+
+
+def test_chunks_follow_the_view(make_simulation):
+    from chunks import chunk_index
+
+    sim = make_simulation(300)
+    walls = sim.chunks.layers[0]
+    assert walls.last < chunk_index(5000)
+
+    # The view far from the player, both stay streamed in
+    sim.view_rect = (5000, 0, 5800, 600)
+    sim.update_chunks()
+    assert walls.first <= chunk_index(sim.player_sprite.center_x)
+    assert walls.last >= chunk_index(5800)
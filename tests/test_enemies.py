@@ -0,0 +1,59 @@
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+arcade = pytest.importorskip("arcade")
+
+from enemies import DEFAULT_ENEMIES, read_enemy_spawns
+
+
+def test_patrollers_on_the_ground_walk(make_simulation):
+    sim = make_simulation(100, 10)
+    store = sim.enemy_store
+    patrolling = ~sim.enemy_chase & sim.enemy_grounded
+    assert patrolling.any()
+
+    xs = []
+    for _ in range(120):
+        sim.step(0)
+        sim.events.clear()
+        xs.append(store.x.copy())
+    xs = np.array(xs)
+    walked = xs.max(axis=0) - xs.min(axis=0)
+    assert (walked[patrolling] > 100).all()
+
+
+def test_enemy_turns_at_a_wall_in_front(make_simulation):
+    sim = make_simulation(100, 2)
+    store = sim.enemy_store
+    wall = sim.moving_platforms_list[0]
+
+    # A patroller flying into a moving wall from the left
+    store.x[1] = wall.left - 2 - store.to_right[1]
+    store.y[1] = wall.center_y
+    store.change_x[1] = 3
+    store.boundary_left[1] = store.boundary_right[1] = math.nan
+    sim.enemy_grounded[1] = False
+    store.push(everything=True)
+
+    sim.step(0)
+    assert store.change_x[1] < 0
+
+
+def test_chase_is_read_from_the_map(monkeypatch):
+    def enemy(chase):
+        properties = {} if chase is None else {"chase": chase}
+        return SimpleNamespace(properties=properties, location=SimpleNamespace(x=0, y=0), size=None,
+                               type="bee", name="")
+
+    values = [None, True, False, "true", "false", "1", "0"]
+    layer = SimpleNamespace(tiled_objects=[enemy(value) for value in values])
+    monkeypatch.setattr(arcade.tilemap, "get_tilemap_layer", lambda my_map, name: layer)
+    my_map = SimpleNamespace(map_size=SimpleNamespace(height=10), tile_size=SimpleNamespace(height=10))
+    assert [spawn.chase for spawn in read_enemy_spawns(my_map)] == [False, True, False, True, False, True, False]
+
+
+def test_default_enemies_dont_chase():
+    assert not any(spawn.chase for spawn in DEFAULT_ENEMIES)
@@ -0,0 +1,114 @@
+import math
+from types import SimpleNamespace
+
+import numpy as np
+
+from entities import EntityStore, CellMap
+
+
+class Box:
+    """ Just enough of a sprite for an EntityStore """
+
+    def __init__(self, x, y, change_x=0.0, change_y=0.0, boundary_left=None, boundary_right=None,
+                 boundary_bottom=None, boundary_top=None, size=10):
+        self.center_x = x
+        self.center_y = y
+        self.change_x = change_x
+        self.change_y = change_y
+        self.size = size
+        self.boundary_left = boundary_left
+        self.boundary_right = boundary_right
+        self.boundary_bottom = boundary_bottom
+        self.boundary_top = boundary_top
+
+    left = property(lambda self: self.center_x - self.size / 2)
+    right = property(lambda self: self.center_x + self.size / 2)
+    bottom = property(lambda self: self.center_y - self.size / 2)
+    top = property(lambda self: self.center_y + self.size / 2)
+
+    @property
+    def position(self):
+        return self.center_x, self.center_y
+
+    @position.setter
+    def position(self, value):
+        self.center_x, self.center_y = value
+
+
+def test_move_and_push():
+    sprites = [Box(0, 0, 2, 1), Box(50, 50)]
+    store = EntityStore(sprites)
+    store.move()
+    store.push()
+    assert sprites[0].position == (2, 1)
+    assert sprites[1].position == (50, 50)
+    assert store.left.tolist() == [-3, 45]
+
+
+def test_bounce():
+    wall = Box(20, 0, 3, boundary_left=0, boundary_right=24)
+    store = EntityStore([wall])
+    store.move()
+    store.bounce()
+    assert store.change_x[0] == -3
+
+    # Still past the boundary but already coming back, no second turn
+    store.bounce()
+    assert store.change_x[0] == -3
+
+
+def test_zero_is_no_boundary_for_moving_walls():
+    wall = Box(20, 0, -3, boundary_left=0, boundary_right=0)
+    store = EntityStore([wall], zero_is_off=True)
+    assert math.isnan(store.boundary_left[0])
+    store.x[:] = -100
+    store.bounce()
+    assert store.change_x[0] == -3
+
+
+def test_patrol():
+    enemies = [Box(0, 0, 3, boundary_left=-50, boundary_right=50),
+               Box(60, 0, 3, boundary_left=-50, boundary_right=50),
+               Box(60, 0, -3, boundary_left=-50, boundary_right=50),
+               Box(60, 0, 3)]
+    store = EntityStore(enemies)
+    store.patrol(np.array([True, False, False, False]))
+    # Hit a wall, walking out, walking back in, no boundaries
+    assert store.change_x.tolist() == [-3, -3, -3, 3]
+
+
+def test_overlaps():
+    store = EntityStore([Box(0, 0), Box(100, 0)])
+    other = EntityStore([Box(8, 0)])
+    assert store.overlaps(other).tolist() == [True, False]
+    assert store.overlaps(EntityStore([])).tolist() == [False, False]
+
+
+def test_bytes_round_trip():
+    sprites = [Box(1, 2, 3, 4), Box(5, 6, 7, 8)]
+    data = EntityStore(sprites).to_bytes()
+    copies = [Box(0, 0), Box(0, 0)]
+    EntityStore(copies).load_bytes(data)
+    assert [(box.center_x, box.center_y, box.change_x, box.change_y) for box in copies] == [
+        (1, 2, 3, 4), (5, 6, 7, 8)]
+
+
+def test_ahead():
+    store = EntityStore([Box(0, 5, 3), Box(50, 5, -2)])
+    left, bottom, right, top = store.ahead(1)
+    assert left.tolist() == [5, 43]
+    assert right.tolist() == [8, 45]
+    assert bottom.tolist() == [1, 1]
+    assert top.tolist() == [9, 9]
+
+
+def test_cell_map_floor_doesnt_fill_the_cell_above():
+    # A 10 pixel floor tile in cell (0, 0), the grid has it in the cells its top and right are on too
+    floor = Box(5, 5)
+    grid = SimpleNamespace(cell_size=10, moving={},
+                           cells={(0, 0): [floor], (1, 0): [floor], (0, 1): [floor], (1, 1): [floor]})
+    cells = CellMap(grid)
+    enemy = EntityStore([Box(5, 15, 3), Box(14, 5, 3)])
+    assert cells.touches(*enemy.ahead(1)).tolist() == [False, False]
+    # The second one is in the floor's cell
+    assert cells.touches(enemy.left, enemy.bottom, enemy.right, enemy.top).tolist() == [False, True]
@@ -0,0 +1,36 @@
+from events import EventBus, CoinCollected, PlayerHit, PlayerJumped
+
+
+def test_dispatch_in_order_to_subscribers():
+    bus = EventBus()
+    got = []
+    bus.subscribe(CoinCollected, lambda event: got.append(("coin", event.score)))
+    bus.subscribe((CoinCollected, PlayerHit), lambda event: got.append(("any", type(event).__name__)))
+
+    bus.emit(CoinCollected(1))
+    bus.emit(PlayerJumped())
+    bus.emit(PlayerHit("enemy", 2))
+    assert len(bus) == 3
+
+    events = bus.dispatch()
+    assert [type(event) for event in events] == [CoinCollected, PlayerJumped, PlayerHit]
+    assert got == [("coin", 1), ("any", "CoinCollected"), ("any", "PlayerHit")]
+    assert len(bus) == 0
+
+
+def test_events_emitted_while_dispatching_wait_for_the_next_dispatch():
+    bus = EventBus()
+    bus.subscribe(CoinCollected, lambda event: bus.emit(PlayerJumped()))
+    bus.emit(CoinCollected(1))
+    assert len(bus.dispatch()) == 1
+    assert [type(event) for event in bus] == [PlayerJumped]
+
+
+def test_clear():
+    bus = EventBus()
+    got = []
+    bus.subscribe(PlayerJumped, got.append)
+    bus.emit(PlayerJumped())
+    bus.clear()
+    assert bus.dispatch() == []
+    assert got == []
@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("arcade")
+
+from simulation import GameSimulation, KEY_RIGHT, KEY_UP
+
+
+def play(simulation, ticks):
+    checksums = []
+    for tick in range(ticks):
+        simulation.step(KEY_RIGHT | KEY_UP if tick % 30 < 15 else KEY_RIGHT)
+        simulation.events.clear()
+        checksums.append(simulation.checksum())
+    return checksums
+
+
+def test_cached_level_plays_the_same_every_time(make_simulation):
+    sim = make_simulation(100, 4, swept_physics=False)
+    level_data = sim.level_cache.get(1)
+    speeds = [(sprite.change_x, sprite.change_y) for sprite in level_data.moving_platforms]
+    first = play(sim, 300)
+
+    # Platforms turned around in the game, not in the cache
+    assert [(sprite.change_x, sprite.change_y) for sprite in level_data.moving_platforms] == speeds
+
+    other = GameSimulation(cache=sim.level_cache, swept_physics=False)
+    other.setup(1)
+    assert play(other, 300) == first
+
+    # Starting the level again, like after game over, the platforms start like the first time
+    sim.setup(1)
+    assert [(wall.center_x, wall.change_x) for wall in sim.moving_platforms_list] == [
+        (sprite.center_x, sprite.change_x) for sprite in level_data.moving_platforms]
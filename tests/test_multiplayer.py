@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("arcade")
+
+from multiplayer import MultiplayerSimulation, world_state, read_world_state, delta, undelta
+
+
+@pytest.fixture
+def make_game(make_simulation):
+    """ A multiplayer game with some players in it """
+    def make(players):
+        sim = MultiplayerSimulation(cache=make_simulation(100, 4).level_cache)
+        sim.setup(1)
+        for player_id in range(1, players + 1):
+            sim.add_player(player_id)
+        return sim
+    return make
+
+
+@pytest.mark.parametrize("players", [1, 3])
+def test_platforms_move_once_a_tick_however_many_players(make_game, players):
+    sim = make_game(players)
+    wall = sim.moving_platforms_list[0]
+    start = wall.center_x
+    sim.step({})
+    assert wall.center_x - start == pytest.approx(abs(wall.change_x))
+
+
+def test_every_player_rides_platforms(make_game):
+    sim = make_game(3)
+    wall = sim.moving_platforms_list[0]
+    rider = sim.players[2].player_sprite
+    rider.center_x = wall.center_x
+    rider.bottom = wall.top
+    rider.change_y = 0
+    start = rider.center_x
+    speed = wall.change_x
+    sim.step({})
+    assert rider.center_x - start == pytest.approx(speed)
+
+
+def test_world_state_round_trip(make_game):
+    sim = make_game(2)
+    sim.run(30, {1: 0, 2: 0})
+    state = read_world_state(world_state(sim))
+
+    assert state["level"] == sim.level
+    assert state["finished"] == sim.finished
+    assert state["coin_bits"] == bytes(sim.coins.bits)
+    assert np.allclose(state["enemies"], [sim.enemy_store.x, sim.enemy_store.y])
+    assert np.allclose(state["platforms"], [sim.platform_store.x, sim.platform_store.y])
+    for row, slot in zip(state["players"], sim.players.values()):
+        assert row["id"] == slot.id
+        assert (row["x"], row["y"]) == pytest.approx((slot.player_sprite.center_x, slot.player_sprite.center_y))
+        assert (row["health"], row["score"]) == (slot.health, slot.game_score)
+        assert row["time"] == pytest.approx(slot.total_time)
+
+
+def test_delta_round_trip(make_game):
+    sim = make_game(2)
+    base = world_state(sim)
+    sim.run(30, {1: 0, 2: 0})
+    state = world_state(sim)
+
+    assert undelta(None, delta(None, state)) == state
+    assert undelta(base, delta(base, state)) == state
+    # Mostly unchanged, so much smaller than the whole state
+    assert len(delta(base, state)) < len(delta(None, state))
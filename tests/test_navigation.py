@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from navigation import NavGrid
+
+SIZE = 10
+
+
+def tile(col, row):
+    return SimpleNamespace(center_x=(col + 0.5) * SIZE, center_y=(row + 0.5) * SIZE)
+
+
+def make_grid(max_distance=40):
+    """
+    Ground along row 0, a floor two tiles up on the right and a ladder up
+    to it in column 5.
+    """
+    walls = [tile(col, 0) for col in range(10)] + [tile(col, 2) for col in range(6, 10)]
+    ladders = [tile(5, 1), tile(5, 2)]
+    return NavGrid(walls, ladders, cell_size=SIZE, max_distance=max_distance)
+
+
+def steps(grid, col, row):
+    x, y = (col + 0.5) * SIZE, (row + 0.5) * SIZE
+    step_x, step_y, reached = grid.directions(np.array([x]), np.array([y]))
+    return int(step_x[0]), int(step_y[0]), bool(reached[0])
+
+
+def test_walkable():
+    grid = make_grid()
+    assert grid.is_walkable(np.array([25.0, 25.0, 75.0, 55.0]), np.array([15.0, 25.0, 35.0, 25.0])).tolist() == [
+        True, False, True, True]
+
+
+def test_steps_toward_the_player():
+    grid = make_grid()
+    assert grid.update([tile(0, 1)])
+    assert steps(grid, 4, 1) == (-1, 0, True)
+    assert steps(grid, 0, 1) == (0, 0, True)
+    # Off the walkable tiles the search doesn't go
+    assert not steps(grid, 2, 4)[2]
+
+
+def test_way_goes_up_the_ladder():
+    grid = make_grid()
+    grid.update([tile(8, 3)])
+    assert steps(grid, 2, 1) == (1, 0, True)
+    assert steps(grid, 5, 1) == (0, 1, True)
+    assert steps(grid, 5, 2) == (0, 1, True)
+    assert steps(grid, 5, 3) == (1, 0, True)
+
+
+def test_nearest_player():
+    grid = make_grid()
+    grid.update([tile(0, 1), tile(9, 1)])
+    assert steps(grid, 2, 1)[0] == -1
+    assert steps(grid, 7, 1)[0] == 1
+
+
+def test_range():
+    grid = make_grid(max_distance=3)
+    grid.update([tile(0, 1)])
+    assert steps(grid, 3, 1)[2]
+    assert not steps(grid, 4, 1)[2]
+
+
+def test_only_searched_when_a_player_changes_tile():
+    grid = make_grid()
+    player = tile(0, 1)
+    assert grid.update([player])
+    player.center_x += 2
+    assert not grid.update([player])
+    # Jumping, the tile under counts
+    player.center_y += 2 * SIZE
+    assert not grid.update([player])
+    player.center_x += SIZE
+    assert grid.update([player])
+    assert grid.searches == 2
+
+
+def test_lost_chaser_walks_back_to_its_boundaries(make_simulation):
+    from constants import GRID_PIXEL_SIZE
+
+    sim = make_simulation(100, 1)
+    store = sim.enemy_store
+    assert sim.enemy_chase[0]
+
+    # Past its right boundary, and too far from the player to find them
+    sim.player_sprite.center_x = 95 * GRID_PIXEL_SIZE
+    store.x[0] = 40 * GRID_PIXEL_SIZE
+    store.push(everything=True)
+    xs = []
+    for _ in range(60):
+        sim.step(0)
+        sim.events.clear()
+        xs.append(store.x[0])
+    assert all(b < a for a, b in zip(xs, xs[1:]))
+
+    # Back in, it walks between its boundaries again
+    sim.run(600)
+    assert store.boundary_left[0] - 3 <= store.left[0] and store.right[0] <= store.boundary_right[0] + 3
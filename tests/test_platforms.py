@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("arcade")
+
+
+@pytest.mark.parametrize("swept_physics", [False, True])
+def test_platform_moves_once_a_tick(make_simulation, swept_physics):
+    sim = make_simulation(swept_physics=swept_physics)
+    wall = sim.moving_platforms_list[0]
+    start = wall.center_x
+    sim.step(0)
+    assert wall.center_x - start == pytest.approx(abs(wall.change_x))
+
+
+@pytest.mark.parametrize("swept_physics", [False, True])
+def test_player_rides_platform(make_simulation, swept_physics):
+    sim = make_simulation(swept_physics=swept_physics)
+    wall = sim.moving_platforms_list[0]
+    player = sim.player_sprite
+    player.center_x = wall.center_x
+    player.bottom = wall.top
+    player.change_y = 0
+    start = player.center_x
+    speed = wall.change_x
+    sim.step(0)
+    assert player.center_x - start == pytest.approx(speed)
+    assert player.bottom == pytest.approx(wall.top)
+
+
+@pytest.mark.parametrize("swept_physics", [False, True])
+def test_platform_pushes_player(make_simulation, swept_physics):
+    sim = make_simulation(swept_physics=swept_physics)
+    wall = sim.moving_platforms_list[0]
+    player = sim.player_sprite
+    # Right in front of a platform moving right
+    player.left = wall.right + 0.5
+    player.bottom = wall.bottom
+    player.change_y = 0
+    sim.step(0)
+    assert player.left >= wall.right - 0.01
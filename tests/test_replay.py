@@ -0,0 +1,49 @@
+import functools
+
+import pytest
+
+pytest.importorskip("arcade")
+
+import replay
+from replay import Recorder, Recording
+from simulation import GameSimulation, KEY_RIGHT, KEY_UP
+
+
+def test_recording_round_trip(tmp_path):
+    recording = Recording(seed=7, level=2, swept_physics=True, start_state=b"state")
+    # Longer than one run can count
+    recording.keys.extend(bytes([KEY_RIGHT]) * 70000 + bytes([0, KEY_UP, KEY_UP]))
+    recording.checksums = [(60, 123), (120, 456)]
+
+    path = tmp_path / "game.rpl"
+    recording.save(path)
+    loaded = Recording.load(path)
+    assert (loaded.seed, loaded.level, loaded.swept_physics) == (7, 2, True)
+    assert loaded.keys == recording.keys
+    assert loaded.checksums == recording.checksums
+    assert loaded.start_state == b"state"
+
+
+def test_other_version_is_refused():
+    data = bytearray(Recording().to_bytes())
+    data[4] = replay.VERSION + 1
+    with pytest.raises(ValueError):
+        Recording.from_bytes(bytes(data))
+
+
+def test_replay_plays_the_same(make_simulation, monkeypatch, tmp_path):
+    recorder = Recorder(make_simulation(100, 4))
+    monkeypatch.setattr(replay, "GameSimulation",
+                        functools.partial(GameSimulation, cache=recorder.simulation.level_cache))
+    for tick in range(300):
+        recorder.step(KEY_RIGHT | KEY_UP if tick % 30 < 15 else KEY_RIGHT)
+        recorder.simulation.events.clear()
+    path = tmp_path / "game.rpl"
+    recorder.save(path)
+
+    recording = Recording.load(path)
+    assert replay.replay(recording) is None
+
+    # A different key somewhere shows up at the next checksum
+    recording.keys[100] = 0
+    assert replay.replay(recording) == 120
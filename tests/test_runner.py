@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("arcade")
+
+from runner import make_jobs, summarize
+
+
+def test_scripted_runs_once_per_level():
+    jobs = make_jobs([1, 2], range(4))
+    assert [job for job in jobs if job[2] == "scripted"] == [(1, 0, "scripted"), (2, 0, "scripted")]
+    assert len([job for job in jobs if job[2] == "random"]) == 8
+
+
+def test_summarize():
+    runs = [
+        {"level": 1, "policy": "random", "finished": True, "coins": 4, "deaths": 0, "hits": 1, "game_seconds": 10.0},
+        {"level": 1, "policy": "random", "finished": False, "coins": 2, "deaths": 1, "hits": 3, "game_seconds": 20.0},
+    ]
+    row = summarize(runs)["level1_random"]
+    assert row["runs"] == 2
+    assert row["finished"] == 1
+    assert row["mean_coins"] == 3
+    assert row["mean_finish_seconds"] == 10.0
@@ -0,0 +1,76 @@
+import pytest
+
+pytest.importorskip("arcade")
+
+import snapshot
+from simulation import KEY_LEFT, KEY_RIGHT, KEY_UP
+
+KEYS = [KEY_RIGHT | KEY_UP, KEY_RIGHT, KEY_LEFT, KEY_RIGHT]
+
+
+def play(simulation, ticks):
+    """ Checksums of some ticks with changing keys, with the animation running like in the game """
+    checksums = []
+    for tick in range(ticks):
+        simulation.step(KEYS[(tick // 37) % len(KEYS)])
+        simulation.events.clear()
+        simulation.player_animator.update(1 / 60)
+        checksums.append(simulation.checksum())
+    return checksums
+
+
+def state(simulation):
+    animator = simulation.player_animator
+    row = animator.index(simulation.player_sprite)
+    return (simulation.checksum(), bytes(simulation.coins.bits), simulation.enemy_store.to_bytes(),
+            simulation.platform_store.to_bytes(), int(animator.state[row]), float(animator.elapsed[row]),
+            simulation.player_sprite.texture)
+
+
+def test_round_trip(make_simulation):
+    sim = make_simulation(150, 30)
+    play(sim, 200)
+    saved = snapshot.to_bytes(sim)
+    before = state(sim)
+
+    play(sim, 100)
+    assert state(sim) != before
+
+    snapshot.restore(sim, saved)
+    assert state(sim) == before
+    assert snapshot.to_bytes(sim) == saved
+
+
+def test_restored_game_plays_the_same(make_simulation):
+    sim = make_simulation(150, 30)
+    play(sim, 200)
+    saved = snapshot.to_bytes(sim)
+    expected = play(sim, 300)
+
+    other = make_simulation(150, 30)
+    snapshot.restore(other, saved)
+    assert play(other, 300) == expected
+
+
+def test_other_version_is_refused(make_simulation):
+    sim = make_simulation(150, 30)
+    data = bytearray(snapshot.to_bytes(sim))
+    data[4] = snapshot.VERSION + 1
+    with pytest.raises(ValueError):
+        snapshot.restore(sim, bytes(data))
+
+
+def test_snapshot_of_another_level_changes_nothing(make_simulation):
+    sim = make_simulation(150, 30)
+    play(sim, 50)
+    before = state(sim)
+
+    other = make_simulation(100, 4)
+    with pytest.raises(ValueError):
+        snapshot.restore(sim, snapshot.to_bytes(other))
+    assert state(sim) == before
+
+
+def test_fixed_part_is_small():
+    # Most of a snapshot is coins, enemies and moving walls
+    assert snapshot.FIXED_SIZE < 100
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("arcade")
+
+from spatial import TileGrid
+
+
+def box(left, bottom, width=10, height=10):
+    return SimpleNamespace(left=left, bottom=bottom, right=left + width, top=bottom + height)
+
+
+def test_in_box():
+    grid = TileGrid(cell_size=10)
+    near = box(12, 12)
+    far = box(100, 100)
+    grid.add_list([near, far])
+    assert grid.in_box(0, 0, 25, 25) == [near]
+    assert grid.in_box(95, 95, 105, 105) == [far]
+    assert grid.in_box(50, 50, 60, 60) == []
+
+
+def test_no_duplicates_for_sprites_over_several_cells():
+    grid = TileGrid(cell_size=10)
+    wide = box(5, 5, 40, 40)
+    grid.add(wide)
+    assert len(grid.cells) > 1
+    assert grid.in_box(0, 0, 50, 50) == [wide]
+    assert grid.nearby(box(20, 20)) == [wide]
+
+
+def test_nearby_leaves_out_the_sprite_itself():
+    grid = TileGrid(cell_size=10)
+    sprite = box(0, 0)
+    other = box(12, 0)
+    grid.add_list([sprite, other])
+    assert grid.nearby(sprite) == [other]
+
+
+def test_moving_sprite_changes_cells():
+    grid = TileGrid(cell_size=10)
+    sprite = box(0, 0, 5, 5)
+    grid.add(sprite, moving=True)
+
+    # Inside the same cell, nothing to do
+    sprite.left, sprite.right = 2, 7
+    grid.update(sprite)
+    assert grid.in_box(0, 0, 9, 9) == [sprite]
+
+    sprite.left, sprite.right = 52, 57
+    grid.update(sprite)
+    assert grid.in_box(0, 0, 9, 9) == []
+    assert grid.in_box(50, 0, 59, 9) == [sprite]
+
+
+def test_remove():
+    grid = TileGrid(cell_size=10)
+    static = box(0, 0)
+    moving = box(30, 0)
+    grid.add(static)
+    grid.add(moving, moving=True)
+    moving.left, moving.right = 60, 70
+    grid.remove(static)
+    grid.remove(moving)
+    assert grid.cells == {}
+    assert grid.moving == {}